@@ -0,0 +1,150 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import shutil
+from importlib.util import find_spec
+from typing import Dict, List, Optional, Set
+
+from quart import Quart, Response, request, send_from_directory
+
+from .config import Config, config as conf
+
+DIST = "dist"
+MANIFEST = "manifest.json"
+SOURCES = ("css", "js")
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+CSS_IMPORT = re.compile(r"""@import\s+(?:url\(\s*)?['"]([^'"]+)['"]\s*\)?\s*;""")
+CSS_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+CSS_STRING = re.compile(r"""("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')""")
+
+
+def bundle_css(path: str, seen: Optional[Set[str]] = None) -> str:
+    seen = set() if seen is None else seen
+    path = os.path.normpath(path)
+    if path in seen:
+        return ""
+    seen.add(path)
+
+    with open(path, encoding="utf-8") as file:
+        source = file.read()
+
+    directory = os.path.dirname(path)
+    return CSS_IMPORT.sub(
+        lambda match: bundle_css(os.path.join(directory, match.group(1)), seen),
+        source,
+    )
+
+
+def minify_css(source: str) -> str:
+    parts = CSS_STRING.split(CSS_COMMENT.sub("", source))
+    for index in range(0, len(parts), 2):
+        part = re.sub(r"\s+", " ", parts[index])
+        part = re.sub(r"\s*([{};,>])\s*", r"\1", part)
+        part = re.sub(r"([{;])([\w-]+): ", r"\1\2:", part)
+        parts[index] = part.replace(";}", "}")
+    return "".join(parts).strip()
+
+
+def asset_sources(static_folder: str) -> List[str]:
+    names = []
+    for source in SOURCES:
+        for directory, _, files in os.walk(os.path.join(static_folder, source)):
+            for file in files:
+                if file.startswith("__") or not file.endswith(f".{source}"):
+                    continue
+                path = os.path.join(directory, file)
+                names.append(os.path.relpath(path, static_folder).replace(os.sep, "/"))
+    return sorted(names)
+
+
+def compress(content: bytes) -> Dict[str, bytes]:
+    variants = {".gz": gzip.compress(content, compresslevel=9, mtime=0)}
+    if find_spec("brotli"):
+        import brotli
+
+        variants[".br"] = brotli.compress(content, quality=11)
+    return variants
+
+
+def write_asset(static_folder: str, name: str, content: bytes) -> None:
+    path = os.path.join(static_folder, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    for suffix, data in {"": content, **compress(content)}.items():
+        with open(path + suffix, "wb") as file:
+            file.write(data)
+
+
+def build_assets(static_folder: str) -> Dict[str, str]:
+    shutil.rmtree(os.path.join(static_folder, DIST), ignore_errors=True)
+
+    manifest = {}
+    for name in asset_sources(static_folder):
+        path = os.path.join(static_folder, name)
+        if name.endswith(".css"):
+            content = minify_css(bundle_css(path)).encode()
+        else:
+            with open(path, "rb") as file:
+                content = file.read()
+
+        stem, extension = os.path.splitext(name)
+        digest = hashlib.sha256(content).hexdigest()[:12]
+        manifest[name] = f"{DIST}/{stem}.{digest}{extension}"
+        write_asset(static_folder, manifest[name], content)
+
+    with open(os.path.join(static_folder, DIST, MANIFEST), "w") as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+    return manifest
+
+
+def load_manifest(static_folder: str) -> Dict[str, str]:
+    try:
+        with open(os.path.join(static_folder, DIST, MANIFEST)) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+async def send_asset(static_folder: str, filename: str, max_age: int) -> Response:
+    mimetype = mimetypes.guess_type(filename)[0]
+    for encoding, suffix in ENCODINGS:
+        if request.accept_encodings[encoding] and os.path.isfile(
+            os.path.join(static_folder, filename + suffix)
+        ):
+            response = await send_from_directory(
+                static_folder, filename + suffix, mimetype=mimetype
+            )
+            response.content_encoding = encoding
+            break
+    else:
+        response = await send_from_directory(static_folder, filename, mimetype=mimetype)
+
+    response.vary.add("Accept-Encoding")
+    response.cache_control.public = True
+    response.cache_control.max_age = max_age
+    response.cache_control.immutable = True
+    return response
+
+
+def register_static_assets(app: Quart, config: Config = conf) -> None:
+    if not config.static_assets:
+        return
+
+    manifest = load_manifest(app.static_folder)
+    if not manifest:
+        return
+
+    @app.url_defaults
+    def hashed_static_url(endpoint: str, values: dict) -> None:
+        if endpoint == "static" and values.get("filename") in manifest:
+            values["filename"] = manifest[values["filename"]]
+
+    async def static(filename: str) -> Response:
+        if not filename.startswith(f"{DIST}/"):
+            return await app.send_static_file(filename)
+        return await send_asset(app.static_folder, filename, config.static_max_age)
+
+    app.view_functions["static"] = static
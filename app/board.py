@@ -0,0 +1,58 @@
+import asyncio
+from typing import Any, Dict, Set
+
+from quart import current_app, has_app_context
+
+from .bus import invalidation_bus
+from .config import config as conf
+
+RESYNC = {"kind": "resync"}
+
+
+class RoomStatusBoard:
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+
+        self._subscribers: Set[asyncio.Queue] = set()
+
+        self.published = 0
+        self.delivered = 0
+        self.resyncs = 0
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+
+    def publish(self, message: Dict[str, Any]) -> None:
+        self.published += 1
+        for queue in self._subscribers:
+            try:
+                queue.put_nowait(message)
+                self.delivered += 1
+            except asyncio.QueueFull:
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC)
+                self.resyncs += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "delivered": self.delivered,
+            "resyncs": self.resyncs,
+        }
+
+
+room_status_board = RoomStatusBoard(conf.board_queue_size)
+invalidation_bus.subscribe("room_status", room_status_board.publish)
+
+
+def current_board() -> RoomStatusBoard:
+    if has_app_context():
+        return current_app.extensions.get("room_status_board", room_status_board)
+    return room_status_board
@@ -0,0 +1,97 @@
+import io
+import csv
+import json
+from datetime import date, datetime
+from enum import Enum
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+IMPORT_BATCH_SIZE = 500
+
+EXPORT_FIELDS = (
+    "id",
+    "username",
+    "surname",
+    "name",
+    "patronymic",
+    "date_of_birth",
+    "phone_number",
+    "registration_address",
+    "gender",
+    "role",
+    "is_banned",
+    "created_at",
+)
+
+
+def detect_format(filename: Optional[str]) -> Optional[str]:
+    if not filename:
+        return None
+    if filename.endswith(".csv"):
+        return "csv"
+    if filename.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    return None
+
+
+def read_rows(
+    stream: io.IOBase, fmt: str
+) -> Iterator[Tuple[int, Optional[Dict[str, str]]]]:
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, _clean(row)
+        return
+
+    for line_num, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield line_num, None
+            continue
+        yield line_num, _clean(row) if isinstance(row, dict) else None
+
+
+def batched(iterable: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def csv_header() -> str:
+    return _csv_line(EXPORT_FIELDS)
+
+
+def format_row(row: Sequence[Any], fmt: str) -> str:
+    values = [_export_value(value) for value in row]
+    if fmt == "csv":
+        return _csv_line(values)
+    return json.dumps(dict(zip(EXPORT_FIELDS, values)), ensure_ascii=False) + "\n"
+
+
+def _clean(row: Dict[str, Any]) -> Dict[str, str]:
+    return {
+        key.strip(): "" if value is None else str(value).strip()
+        for key, value in row.items()
+        if key is not None
+    }
+
+
+def _export_value(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def _csv_line(values: Sequence[Any]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(values)
+    return buffer.getvalue()
@@ -0,0 +1,203 @@
+import asyncio
+import json
+import uuid
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Set
+
+from quart import Quart, current_app, has_app_context
+
+from .cache import Caches, caches
+from .config import Config, config as conf
+
+if TYPE_CHECKING:
+    import asyncpg
+
+Handler = Callable[[Dict[str, Any]], Any]
+
+
+class InvalidationBus:
+    def __init__(self, config: Config):
+        self.config = config
+        self.channel = config.bus_channel
+        self.origin = uuid.uuid4().hex[:12]
+
+        self._handlers: Dict[str, List[Handler]] = {}
+        self._connection: Optional["asyncpg.Connection"] = None
+        self._lock = asyncio.Lock()
+        self._lost = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._handler_tasks: Set[asyncio.Task] = set()
+
+        self.published = 0
+        self.received = 0
+        self.reconnects = 0
+
+    def subscribe(self, kind: str, handler: Handler) -> None:
+        self._handlers.setdefault(kind, []).append(handler)
+
+    def unsubscribe(self, kind: str, handler: Handler) -> None:
+        handlers = self._handlers.get(kind, [])
+        if handler in handlers:
+            handlers.remove(handler)
+
+    def dispatch(self, message: Dict[str, Any]) -> None:
+        for handler in list(self._handlers.get(message.get("kind"), ())):
+            result = handler(message)
+            if asyncio.iscoroutine(result):
+                task = asyncio.ensure_future(result)
+                self._handler_tasks.add(task)
+                task.add_done_callback(self._handler_tasks.discard)
+
+    async def publish(self, kind: str, **payload: Any) -> None:
+        message = {"kind": kind, **payload}
+        self.dispatch(message)
+
+        if not self.connected:
+            return
+
+        import asyncpg
+
+        message["origin"] = self.origin
+        try:
+            async with self._lock:
+                connection = self._connection
+                if connection is None or connection.is_closed():
+                    return
+                await connection.execute(
+                    "SELECT pg_notify($1, $2)",
+                    self.channel,
+                    json.dumps(message, separators=(",", ":")),
+                )
+            self.published += 1
+        except (
+            OSError,
+            asyncpg.PostgresError,
+            asyncpg.InterfaceError,
+            asyncpg.InternalClientError,
+        ):
+            self._lost.set()
+
+    def _on_notification(self, connection, pid, channel, payload: str) -> None:
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            return
+        if message.get("origin") == self.origin:
+            return
+
+        self.received += 1
+        self.dispatch(message)
+
+    def _on_termination(self, connection) -> None:
+        self._lost.set()
+
+    async def _connect(self) -> "asyncpg.Connection":
+        import asyncpg
+
+        connection = await asyncpg.connect(
+            host=self.config.host,
+            port=int(self.config.port),
+            user=self.config.user,
+            password=self.config.password,
+            database=self.config.db_name,
+        )
+        await connection.add_listener(self.channel, self._on_notification)
+        connection.add_termination_listener(self._on_termination)
+        return connection
+
+    async def _run(self) -> None:
+        import asyncpg
+
+        delay = 0.5
+        connected_before = False
+        while True:
+            try:
+                self._connection = await self._connect()
+            except (OSError, asyncpg.PostgresError):
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30)
+                continue
+
+            if connected_before:
+                self.reconnects += 1
+                self.dispatch({"kind": "reset"})
+            connected_before = True
+            delay = 0.5
+
+            self._lost.clear()
+            await self._lost.wait()
+            await self._close_connection()
+
+    async def _close_connection(self) -> None:
+        connection, self._connection = self._connection, None
+        if connection is not None and not connection.is_closed():
+            async with self._lock:
+                await connection.close()
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self._close_connection()
+
+    @property
+    def connected(self) -> bool:
+        return self._connection is not None and not self._connection.is_closed()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "connected": int(self.connected),
+            "published": self.published,
+            "received": self.received,
+            "reconnects": self.reconnects,
+        }
+
+
+async def reload_token_deny_list(message: Dict[str, Any]) -> None:
+    from .queries import load_token_deny_list
+
+    await load_token_deny_list()
+
+
+def subscribe_caches(bus: InvalidationBus, caches: Caches) -> None:
+    bus.subscribe("user", lambda message: caches.current_user.invalidate(message["id"]))
+    bus.subscribe(
+        "user_revoked",
+        lambda message: caches.deny_list.revoke_user(message["id"], message["at"]),
+    )
+    bus.subscribe(
+        "token_revoked",
+        lambda message: caches.deny_list.revoke_token(message["jti"], message["exp"]),
+    )
+    bus.subscribe(
+        "reference", lambda message: caches.reference.invalidate(message["name"])
+    )
+    bus.subscribe("reset", lambda message: caches.reset())
+    bus.subscribe("reset", reload_token_deny_list)
+
+
+invalidation_bus = InvalidationBus(conf)
+subscribe_caches(invalidation_bus, caches)
+
+
+def current_bus() -> InvalidationBus:
+    if has_app_context():
+        return current_app.extensions.get("invalidation_bus", invalidation_bus)
+    return invalidation_bus
+
+
+def register_invalidation_bus(app: Quart, bus: InvalidationBus) -> None:
+    if not bus.config.bus_enabled:
+        return
+
+    @app.before_serving
+    async def start_invalidation_bus():
+        await bus.start()
+
+    @app.after_serving
+    async def stop_invalidation_bus():
+        await bus.stop()
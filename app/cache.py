@@ -0,0 +1,162 @@
+import heapq
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Set, Tuple
+
+from quart import current_app, has_app_context
+
+from .config import Config, config as conf
+
+
+class TTLCache:
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+
+        self._data: "OrderedDict[Hashable, Tuple[float, Hashable, Any]]" = OrderedDict()
+        self._tags: Dict[Hashable, Set[Hashable]] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, _, value = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        tag: Hashable = None,
+        ttl: Optional[float] = None,
+    ) -> None:
+        if self.maxsize <= 0:
+            return
+
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+
+        if key in self._data:
+            self._remove(key)
+
+        self._data[key] = (time.monotonic() + ttl, tag, value)
+        self._tags.setdefault(tag, set()).add(key)
+
+        while len(self._data) > self.maxsize:
+            oldest = next(iter(self._data))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def invalidate(self, tag: Hashable) -> None:
+        for key in self._tags.pop(tag, set()):
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._tags.clear()
+
+    def _remove(self, key: Hashable) -> None:
+        _, tag, _ = self._data.pop(key)
+        keys = self._tags.get(tag)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._tags[tag]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class DenyList:
+    def __init__(self, retention: float):
+        self.retention = retention
+
+        self._tokens: Dict[str, float] = {}
+        self._users: Dict[int, float] = {}
+        self._token_expiry: List[Tuple[float, str]] = []
+        self._user_expiry: List[Tuple[float, float, int]] = []
+
+    def revoke_token(self, jti: str, expires_at: float) -> None:
+        if expires_at > self._tokens.get(jti, 0):
+            self._tokens[jti] = expires_at
+            heapq.heappush(self._token_expiry, (expires_at, jti))
+        self.purge()
+
+    def revoke_user(self, user_id: int, revoked_at: Optional[float] = None) -> None:
+        revoked_at = time.time() if revoked_at is None else revoked_at
+        if revoked_at > self._users.get(user_id, float("-inf")):
+            self._users[user_id] = revoked_at
+            heapq.heappush(
+                self._user_expiry, (revoked_at + self.retention, revoked_at, user_id)
+            )
+        self.purge()
+
+    def __contains__(self, jti: str) -> bool:
+        return jti in self._tokens
+
+    def is_revoked(self, payload: Dict[str, Any]) -> bool:
+        if payload.get("jti") in self._tokens:
+            return True
+
+        revoked_at = self._users.get(payload.get("identity"))
+        return revoked_at is not None and payload.get("iat", 0) <= revoked_at
+
+    def purge(self) -> None:
+        now = time.time()
+        while self._token_expiry and self._token_expiry[0][0] <= now:
+            expires_at, jti = heapq.heappop(self._token_expiry)
+            if self._tokens.get(jti) == expires_at:
+                del self._tokens[jti]
+        while self._user_expiry and self._user_expiry[0][0] <= now:
+            _, revoked_at, user_id = heapq.heappop(self._user_expiry)
+            if self._users.get(user_id) == revoked_at:
+                del self._users[user_id]
+
+    def stats(self) -> Dict[str, int]:
+        return {"tokens": len(self._tokens), "users": len(self._users)}
+
+
+class Caches:
+    def __init__(self, config: Config):
+        self.current_user = TTLCache(config.user_cache_size, config.user_cache_ttl)
+        self.deny_list = DenyList(config.refresh_token_lifetime)
+        self.fragments = TTLCache(config.fragment_cache_size, config.fragment_cache_ttl)
+        self.reference = TTLCache(
+            config.reference_cache_size, config.reference_cache_ttl
+        )
+        self.count = TTLCache(config.count_cache_size, config.count_cache_ttl)
+
+    def reset(self) -> None:
+        self.current_user.clear()
+        self.reference.clear()
+        self.fragments.clear()
+        self.count.clear()
+
+
+caches = Caches(conf)
+
+
+def current_caches() -> Caches:
+    if has_app_context():
+        return current_app.extensions.get("caches", caches)
+    return caches
@@ -1,31 +1,136 @@
 import os
-from dotenv import load_dotenv
+from typing import Mapping, Optional
 
-os.environ.pop("HOST", None)
-os.environ.pop("PORT", None)
+from dotenv import dotenv_values
+from quart import current_app, has_app_context
 
-os.environ.pop("DBNAME", None)
-os.environ.pop("USER", None)
-os.environ.pop("PASSWORD", None)
+SHADOWED_ENVIRON = (
+    "HOST",
+    "PORT",
+    "DBNAME",
+    "USER",
+    "PASSWORD",
+    "SECRET_KEY",
+    "TOKEN_LIFETIME",
+)
 
-os.environ.pop("SECRET_KEY", None)
-os.environ.pop("TOKEN_LIFETIME", None)
+
+def getenv_bool(env: Mapping[str, str], key: str, default: bool = False) -> bool:
+    value = env.get(key)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
 
 
 class Config:
-    def __init__(self):
-        load_dotenv()
+    def __init__(
+        self,
+        env_file: Optional[str] = None,
+        environ: Optional[Mapping[str, str]] = None,
+    ):
+        if environ is None:
+            environ = {
+                key: value
+                for key, value in os.environ.items()
+                if key not in SHADOWED_ENVIRON
+            }
+        env = {**dotenv_values(env_file or environ.get("ENV_FILE")), **environ}
 
-        self.host = os.getenv("HOST")
-        self.port = os.getenv("PORT")
-        self.user = os.getenv("USER")
-        self.password = os.getenv("PASSWORD")
-        self.db_name = os.getenv("DBNAME")
+        self.host = env.get("HOST")
+        self.port = env.get("PORT")
+        self.user = env.get("USER")
+        self.password = env.get("PASSWORD")
+        self.db_name = env.get("DBNAME")
 
         self.database_url = f"postgresql+asyncpg://{self.user}:{self.password}@{self.host}:{self.port}/{self.db_name}"
 
-        self.secret = os.getenv("SECRET_KEY")
-        self.token_lifetime = int(os.getenv("TOKEN_LIFETIME"))
+        self.replica_host = env.get("REPLICA_HOST")
+        self.replica_database_url = (
+            f"postgresql+asyncpg://{env.get('REPLICA_USER', self.user)}"
+            f":{env.get('REPLICA_PASSWORD', self.password)}"
+            f"@{self.replica_host}:{env.get('REPLICA_PORT', self.port)}"
+            f"/{env.get('REPLICA_DBNAME', self.db_name)}"
+            if self.replica_host
+            else None
+        )
+        self.read_your_writes_window = float(env.get("READ_YOUR_WRITES_WINDOW", 5))
+
+        self.db_echo = getenv_bool(env, "DB_ECHO")
+        self.db_pool_size = int(env.get("DB_POOL_SIZE", 5))
+        self.db_max_overflow = int(env.get("DB_MAX_OVERFLOW", 10))
+        self.db_pool_timeout = float(env.get("DB_POOL_TIMEOUT", 30))
+        self.db_pool_recycle = int(env.get("DB_POOL_RECYCLE", 1800))
+        self.db_pool_pre_ping = getenv_bool(env, "DB_POOL_PRE_PING", True)
+
+        self.secret = env.get("SECRET_KEY")
+        self.token_lifetime = int(env.get("TOKEN_LIFETIME", 3600))
+        self.stateless_tokens = getenv_bool(env, "STATELESS_TOKENS")
+        self.refresh_token_lifetime = int(
+            env.get("REFRESH_TOKEN_LIFETIME", 14 * 24 * 3600)
+        )
+
+        self.hash_executor = env.get("HASH_EXECUTOR", "thread")
+        self.hash_workers = int(env.get("HASH_WORKERS", os.cpu_count() or 1))
+        self.hash_concurrency = int(env.get("HASH_CONCURRENCY", self.hash_workers * 2))
+        self.hash_import_concurrency = int(env.get("HASH_IMPORT_CONCURRENCY", 1))
+
+        self.metrics_token = env.get("METRICS_TOKEN")
+
+        self.user_cache_size = int(env.get("USER_CACHE_SIZE", 1024))
+        self.user_cache_ttl = float(env.get("USER_CACHE_TTL", 30))
+
+        self.reference_cache_size = int(env.get("REFERENCE_CACHE_SIZE", 64))
+        self.reference_cache_ttl = float(env.get("REFERENCE_CACHE_TTL", 3600))
+
+        self.count_cache_size = int(env.get("COUNT_CACHE_SIZE", 256))
+        self.count_cache_ttl = float(env.get("COUNT_CACHE_TTL", 3600))
+        self.count_estimate_threshold = int(env.get("COUNT_ESTIMATE_THRESHOLD", 10000))
+        self.max_upload_size = int(env.get("MAX_UPLOAD_SIZE", 64 * 1024 * 1024))
+
+        self.bus_enabled = getenv_bool(env, "BUS_ENABLED", True)
+        self.bus_channel = env.get("BUS_CHANNEL", "hotel_invalidation")
+
+        self.board_queue_size = int(env.get("BOARD_QUEUE_SIZE", 64))
+        self.board_heartbeat = float(env.get("BOARD_HEARTBEAT", 15))
+
+        self.templates_auto_reload = getenv_bool(env, "TEMPLATES_AUTO_RELOAD")
+        self.template_cache_dir = env.get("TEMPLATE_CACHE_DIR")
+        self.fragment_cache_size = int(env.get("FRAGMENT_CACHE_SIZE", 10000))
+        self.fragment_cache_ttl = float(env.get("FRAGMENT_CACHE_TTL", 3600))
+
+        self.static_assets = getenv_bool(env, "STATIC_ASSETS", True)
+        self.static_max_age = int(env.get("STATIC_MAX_AGE", 365 * 24 * 3600))
+
+        self.compress_enabled = getenv_bool(env, "COMPRESS_ENABLED", True)
+        self.compress_min_size = int(env.get("COMPRESS_MIN_SIZE", 1024))
+        self.compress_stream_size = int(env.get("COMPRESS_STREAM_SIZE", 64 * 1024))
+        self.compress_gzip_level = int(env.get("COMPRESS_GZIP_LEVEL", 6))
+        self.compress_brotli_quality = int(env.get("COMPRESS_BROTLI_QUALITY", 4))
+        self.compress_mimetypes = env.get(
+            "COMPRESS_MIMETYPES",
+            "text/html,text/css,text/plain,text/csv,application/json,"
+            "application/x-ndjson,application/javascript",
+        ).split(",")
+
+        self.report_refresh_interval = float(env.get("REPORT_REFRESH_INTERVAL", 300))
+        self.report_refresh_past_days = int(env.get("REPORT_REFRESH_PAST_DAYS", 7))
+        self.report_refresh_future_days = int(
+            env.get("REPORT_REFRESH_FUTURE_DAYS", 365)
+        )
+
+        self.server_bind = env.get("SERVER_BIND", "0.0.0.0:5000")
+        self.server_workers = int(env.get("SERVER_WORKERS", os.cpu_count() or 1))
+        self.server_keep_alive = float(env.get("SERVER_KEEP_ALIVE", 5))
+        self.server_graceful_timeout = float(env.get("SERVER_GRACEFUL_TIMEOUT", 30))
+        self.server_certfile = env.get("SERVER_CERTFILE")
+        self.server_keyfile = env.get("SERVER_KEYFILE")
+        self.server_access_log = env.get("SERVER_ACCESS_LOG")
 
 
 config = Config()
+
+
+def current_config() -> Config:
+    if has_app_context():
+        return current_app.extensions.get("config", config)
+    return config
@@ -1,23 +1,284 @@
-from typing import AsyncGenerator
+import math
+import os
+import time
+from typing import AsyncGenerator, Callable, Dict, List, Optional
 from contextlib import asynccontextmanager
-from sqlalchemy.orm import DeclarativeBase
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from weakref import WeakSet
+from quart import (
+    Response,
+    current_app,
+    g,
+    has_app_context,
+    has_request_context,
+    request,
+)
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import DeclarativeBase, ORMExecuteState, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 
-from .config import config as conf
+from .config import Config, config as conf
 
-engine = create_async_engine(conf.database_url, echo=True)
 
-async_session = async_sessionmaker(
-    bind=engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-)
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "idle": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "max_overflow": self._max_overflow,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_avg_ms": (
+                self.wait_total / self.checkouts * 1000 if self.checkouts else 0.0
+            ),
+            "wait_max_ms": self.wait_max * 1000,
+        }
+
+
+READ_YOUR_WRITES_COOKIE = "primary_until"
+
+EngineHook = Callable[[AsyncEngine], None]
+engine_created: List[EngineHook] = []
+
+
+class Database:
+    def __init__(self, config: Config):
+        self.config = config
+
+        self._engine: Optional[AsyncEngine] = None
+        self._replica_engine: Optional[AsyncEngine] = None
+        self._session: Optional[async_sessionmaker] = None
+        self._replica_session: Optional[async_sessionmaker] = None
+
+        _databases.add(self)
+
+    def build_engine(self, database_url: str) -> AsyncEngine:
+        bound = create_async_engine(
+            database_url,
+            echo=self.config.db_echo,
+            poolclass=TimedQueuePool,
+            pool_size=self.config.db_pool_size,
+            max_overflow=self.config.db_max_overflow,
+            pool_timeout=self.config.db_pool_timeout,
+            pool_recycle=self.config.db_pool_recycle,
+            pool_pre_ping=self.config.db_pool_pre_ping,
+        )
+        for hook in engine_created:
+            hook(bound)
+        return bound
+
+    @property
+    def has_replica(self) -> bool:
+        return self.config.replica_database_url is not None
+
+    @property
+    def engine(self) -> AsyncEngine:
+        if self._engine is None:
+            self._engine = self.build_engine(self.config.database_url)
+        return self._engine
+
+    @property
+    def replica_engine(self) -> Optional[AsyncEngine]:
+        if self._replica_engine is None and self.has_replica:
+            self._replica_engine = self.build_engine(self.config.replica_database_url)
+        return self._replica_engine
+
+    @property
+    def session(self) -> async_sessionmaker:
+        if self._session is None:
+            self._session = async_sessionmaker(
+                bind=self.engine,
+                class_=AsyncSession,
+                sync_session_class=PrimarySession,
+                expire_on_commit=False,
+            )
+        return self._session
+
+    @property
+    def replica_session(self) -> async_sessionmaker:
+        if self._replica_session is None:
+            self._replica_session = async_sessionmaker(
+                bind=self.replica_engine,
+                class_=AsyncSession,
+                expire_on_commit=False,
+            )
+        return self._replica_session
+
+    def engines(self) -> List[AsyncEngine]:
+        return [
+            bound for bound in (self._engine, self._replica_engine) if bound is not None
+        ]
+
+    def reset_after_fork(self) -> None:
+        for bound in self.engines():
+            bound.sync_engine.dispose(close=False)
+
+    async def dispose(self) -> None:
+        for bound in self.engines():
+            await bound.dispose()
+
+    def pool_stats(self) -> Dict[str, float]:
+        return self.engine.pool.stats()
+
+    def replica_pool_stats(self) -> Optional[Dict[str, float]]:
+        if not self.has_replica:
+            return None
+        return self.replica_engine.pool.stats()
+
+
+_databases: "WeakSet[Database]" = WeakSet()
+database = Database(conf)
+
+
+def current_database() -> Database:
+    if has_app_context():
+        return current_app.extensions.get("database", database)
+    return database
+
+
+def engines() -> List[AsyncEngine]:
+    return [bound for db in _databases for bound in db.engines()]
+
+
+def reset_engine_after_fork() -> None:
+    for db in _databases:
+        db.reset_after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=reset_engine_after_fork)
+
+
+async def dispose_engine() -> None:
+    await current_database().dispose()
+
+
+def pool_stats() -> Dict[str, float]:
+    return current_database().pool_stats()
+
+
+def replica_pool_stats() -> Optional[Dict[str, float]]:
+    return current_database().replica_pool_stats()
+
+
+class PrimarySession(Session):
+    pass
+
+
+def _track_flush(session: Session, flush_context) -> None:
+    session.info["wrote"] = True
+
+
+def _track_statement(state: ORMExecuteState) -> None:
+    if state.is_insert or state.is_update or state.is_delete:
+        state.session.info["wrote"] = True
+
+
+def _mark_primary_write(session: Session) -> None:
+    if session.info.pop("wrote", False) and has_request_context():
+        g.primary_write = True
+
+
+def _forget_writes(session: Session, *args) -> None:
+    session.info.pop("wrote", None)
+
+
+event.listen(PrimarySession, "after_flush", _track_flush)
+event.listen(PrimarySession, "do_orm_execute", _track_statement)
+event.listen(PrimarySession, "after_commit", _mark_primary_write)
+event.listen(PrimarySession, "after_rollback", _forget_writes)
+
+
+def reads_from_primary() -> bool:
+    has_replica = current_database().has_replica
+    if not has_replica or not has_request_context():
+        return not has_replica
+    if g.get("primary_write"):
+        return True
+    try:
+        pinned_until = float(request.cookies.get(READ_YOUR_WRITES_COOKIE, 0))
+    except ValueError:
+        return False
+    return pinned_until > time.time()
+
+
+async def pin_primary_after_write(response: Response) -> Response:
+    db = current_database()
+    if db.has_replica and g.get("primary_write"):
+        window = db.config.read_your_writes_window
+        response.set_cookie(
+            READ_YOUR_WRITES_COOKIE,
+            str(time.time() + window),
+            max_age=math.ceil(window),
+            httponly=True,
+        )
+    return response
 
 
 @asynccontextmanager
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
-    async with async_session() as session:
+    if has_request_context():
+        session = g.get("db_session")
+        if session is None:
+            session = g.db_session = current_database().session()
+        yield session
+        return
+
+    async with current_database().session() as session:
+        yield session
+
+
+@asynccontextmanager
+async def get_read_session() -> AsyncGenerator[AsyncSession, None]:
+    if reads_from_primary():
+        async with get_session() as session:
+            yield session
+        return
+
+    if has_request_context():
+        session = g.get("db_read_session")
+        if session is None:
+            session = g.db_read_session = current_database().replica_session()
         yield session
+        return
+
+    async with current_database().replica_session() as session:
+        yield session
+
+
+async def close_request_session(exc: Optional[BaseException] = None) -> None:
+    for name in ("db_session", "db_read_session"):
+        session = g.pop(name, None)
+        if session is not None:
+            await session.close()
 
 
 class Base(DeclarativeBase):
@@ -0,0 +1,114 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Optional
+
+from quart import current_app, has_app_context
+
+from .config import Config, config as conf
+
+
+def _hash(password: bytes) -> bytes:
+    import bcrypt
+
+    return bcrypt.hashpw(password, bcrypt.gensalt())
+
+
+def _check(password: bytes, hashed_password: bytes) -> bool:
+    import bcrypt
+
+    return bcrypt.checkpw(password, hashed_password)
+
+
+class HashingPool:
+    def __init__(self, config: Config):
+        self.kind = config.hash_executor
+        self.workers = config.hash_workers
+        self.concurrency = config.hash_concurrency
+        self.import_concurrency = config.hash_import_concurrency
+
+        self._executor: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._import_semaphore: Optional[asyncio.Semaphore] = None
+
+        self.waiting = 0
+        self.running = 0
+        self.completed = 0
+        self.max_waiting = 0
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="bcrypt"
+                )
+        return self._executor
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._semaphore
+
+    @property
+    def import_semaphore(self) -> asyncio.Semaphore:
+        if self._import_semaphore is None:
+            self._import_semaphore = asyncio.Semaphore(self.import_concurrency)
+        return self._import_semaphore
+
+    async def run(self, func, *args):
+        self.waiting += 1
+        self.max_waiting = max(self.max_waiting, self.waiting)
+        try:
+            await self.semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        self.running += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, func, *args)
+        finally:
+            self.running -= 1
+            self.completed += 1
+            self.semaphore.release()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "workers": self.workers,
+            "concurrency": self.concurrency,
+            "import_concurrency": self.import_concurrency,
+            "waiting": self.waiting,
+            "running": self.running,
+            "completed": self.completed,
+            "max_waiting": self.max_waiting,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self._semaphore = None
+        self._import_semaphore = None
+
+
+hashing_pool = HashingPool(conf)
+
+
+def current_hashing_pool() -> HashingPool:
+    if has_app_context():
+        return current_app.extensions.get("hashing_pool", hashing_pool)
+    return hashing_pool
+
+
+async def hash_password(password: str) -> str:
+    hashed_password = await current_hashing_pool().run(_hash, password.encode("utf-8"))
+    return hashed_password.decode("utf-8")
+
+
+async def check_password(password: str, hashed_password: str) -> bool:
+    return await current_hashing_pool().run(
+        _check, password.encode("utf-8"), hashed_password.encode("utf-8")
+    )
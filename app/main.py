@@ -1,32 +1,136 @@
+import os
 import asyncio
 import argparse
 import datetime
+from importlib.util import find_spec
+from typing import Optional
+
 from quart import Quart
-from quart_jwt_extended import JWTManager
 
-from .config import config as conf
-from .database import get_session
-from .models import User, Gender, Role
-from .router import index_router, auth_router, users_router
+from .config import Config, config as conf
+from .database import (
+    Database,
+    database as default_database,
+    get_session,
+    close_request_session,
+    dispose_engine,
+    pin_primary_after_write,
+)
+
+
+def create_app(config: Optional[Config] = None) -> Quart:
+    from quart_jwt_extended import JWTManager
+
+    from .assets import register_static_assets
+    from .board import RoomStatusBoard, room_status_board
+    from .bus import (
+        InvalidationBus,
+        invalidation_bus,
+        register_invalidation_bus,
+        subscribe_caches,
+    )
+    from .cache import Caches, caches
+    from .hashing import HashingPool, hashing_pool
+    from .metrics import instrument
+    from .middleware import compress_responses
+    from .queries import load_token_deny_list
+    from .scheduler import schedule_report_refresh
+    from .templating import configure_templates
+    from .router import (
+        index_router,
+        auth_router,
+        users_router,
+        rooms_router,
+        reports_router,
+        system_router,
+    )
+
+    config = config or conf
+    if not config.secret:
+        raise ValueError("SECRET_KEY не задан")
+
+    if config is conf:
+        database = default_database
+        app_caches = caches
+        bus = invalidation_bus
+        board = room_status_board
+        pool = hashing_pool
+    else:
+        database = Database(config)
+        app_caches = Caches(config)
+        bus = InvalidationBus(config)
+        subscribe_caches(bus, app_caches)
+        board = RoomStatusBoard(config.board_queue_size)
+        bus.subscribe("room_status", board.publish)
+        pool = HashingPool(config)
+
+    app = Quart(__name__, static_folder="static", template_folder="templates")
+    app.extensions["config"] = config
+    app.extensions["database"] = database
+    app.extensions["caches"] = app_caches
+    app.extensions["invalidation_bus"] = bus
+    app.extensions["room_status_board"] = board
+    app.extensions["hashing_pool"] = pool
+    compress_responses(app, config)
+    configure_templates(app, config)
+    register_static_assets(app, config)
+
+    app.config["MAX_CONTENT_LENGTH"] = config.max_upload_size
+    app.config["JWT_SECRET_KEY"] = config.secret
+    app.config["JWT_ACCESS_COOKIE_NAME"] = "access_token"
+    app.config["JWT_TOKEN_LOCATION"] = ["cookies"]
+    app.config["JWT_ACCESS_TOKEN_EXPIRES"] = datetime.timedelta(hours=1)
+    app.config["JWT_COOKIE_SECURE"] = False
+    app.config["JWT_ACCESS_COOKIE_PATH"] = "/"
+    app.config["JWT_COOKIE_CSRF_PROTECT"] = True
+    app.config["JWT_REFRESH_COOKIE_NAME"] = "refresh_token"
+    app.config["JWT_REFRESH_COOKIE_PATH"] = "/refresh"
+    app.config["JWT_REFRESH_CSRF_COOKIE_PATH"] = "/refresh"
+
+    JWTManager(app)
+
+    app.register_blueprint(index_router)
+    app.register_blueprint(auth_router)
+    app.register_blueprint(users_router)
+    app.register_blueprint(rooms_router)
+    app.register_blueprint(reports_router)
+    app.register_blueprint(system_router)
 
-app = Quart(__name__, static_folder="static", template_folder="templates")
+    app.teardown_request(close_request_session)
+    app.after_request(pin_primary_after_write)
 
-app.config["JWT_SECRET_KEY"] = conf.secret
-app.config["JWT_ACCESS_COOKIE_NAME"] = "access_token"
-app.config["JWT_TOKEN_LOCATION"] = ["cookies"]
-app.config["JWT_ACCESS_TOKEN_EXPIRES"] = datetime.timedelta(hours=1)
-app.config["JWT_COOKIE_SECURE"] = False
-app.config["JWT_ACCESS_COOKIE_PATH"] = "/"
-app.config["JWT_COOKIE_CSRF_PROTECT"] = True
+    instrument(app)
+    schedule_report_refresh(app, config)
+    register_invalidation_bus(app, bus)
 
-jwt = JWTManager(app)
+    if config.stateless_tokens:
 
-app.register_blueprint(index_router)
-app.register_blueprint(auth_router)
-app.register_blueprint(users_router)
+        @app.before_serving
+        async def restore_token_deny_list():
+            await load_token_deny_list()
+
+    @app.after_serving
+    async def shutdown_hashing_pool():
+        pool.shutdown()
+
+    @app.after_serving
+    async def close_database_pool():
+        await database.dispose()
+
+    return app
+
+
+def __getattr__(name: str):
+    if name == "app":
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 async def create_superuser():
+    from .models import User, Gender, Role
+
     async with get_session() as session:
         admin = User(
             name="Тимофей",
@@ -45,6 +149,41 @@ async def create_superuser():
         await session.commit()
         print("Суперпользователь создан!")
 
+    await dispose_engine()
+
+
+def serve(workers: int) -> int:
+    from hypercorn.config import Config as HypercornConfig
+    from hypercorn.run import run
+
+    server_config = HypercornConfig()
+    server_config.application_path = "app.main:create_app()"
+    server_config.bind = [bind.strip() for bind in conf.server_bind.split(",")]
+    server_config.workers = workers
+    server_config.worker_class = "uvloop" if find_spec("uvloop") else "asyncio"
+    server_config.keep_alive_timeout = conf.server_keep_alive
+    server_config.graceful_timeout = conf.server_graceful_timeout
+    server_config.certfile = conf.server_certfile
+    server_config.keyfile = conf.server_keyfile
+    server_config.accesslog = conf.server_access_log
+    server_config.errorlog = "-"
+    return run(server_config)
+
+
+def build_static_assets():
+    from .assets import build_assets
+
+    manifest = build_assets(os.path.join(os.path.dirname(__file__), "static"))
+    print(f"Статика собрана: {len(manifest)} файлов")
+
+
+async def refresh_reports():
+    from .queries import refresh_all_stats
+
+    rows = await refresh_all_stats()
+    print(f"Отчёты пересчитаны: {rows} строк")
+    await dispose_engine()
+
 
 def parse_arguments():
     parser = argparse.ArgumentParser(description="Запуск приложения с параметрами")
@@ -54,6 +193,30 @@ def parse_arguments():
         default=False,
         help="Создать суперпользователя перед запуском приложения",
     )
+    parser.add_argument(
+        "--refresh-reports",
+        action="store_true",
+        default=False,
+        help="Пересчитать отчёты по загрузке за всю историю заказов",
+    )
+    parser.add_argument(
+        "--build-assets",
+        action="store_true",
+        default=False,
+        help="Собрать, минифицировать и сжать статику с хешами в именах файлов",
+    )
+    parser.add_argument(
+        "--production",
+        action="store_true",
+        default=False,
+        help="Запуск через Hypercorn с несколькими воркерами",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=conf.server_workers,
+        help="Количество воркеров в режиме --production",
+    )
     return parser.parse_args()
 
 
@@ -63,4 +226,15 @@ if __name__ == "__main__":
     if args.create_superuser:
         asyncio.run(create_superuser())
 
+    if args.refresh_reports:
+        asyncio.run(refresh_reports())
+
+    if args.build_assets:
+        build_static_assets()
+
+    if args.production:
+        raise SystemExit(serve(args.workers))
+
+    app = create_app()
+    app.config["TEMPLATES_AUTO_RELOAD"] = True
     app.run(host="0.0.0.0", port=5000, debug=True, use_reloader=True)
@@ -0,0 +1,184 @@
+import os
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, List, Sequence, Tuple
+
+from quart import Quart, Response, g, has_request_context, request
+from quart.signals import before_render_template, template_rendered
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from .board import current_board
+from .bus import current_bus
+from .cache import current_caches
+from .database import engine_created, engines, pool_stats, replica_pool_stats
+from .hashing import current_hashing_pool
+from .timing import add_timing, timed
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    def __init__(self, name: str, description: str, buckets: Sequence[float]):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(buckets)
+
+        self._counts: Dict[str, List[int]] = defaultdict(
+            lambda: [0] * (len(self.buckets) + 1)
+        )
+        self._sums: Dict[str, float] = defaultdict(float)
+
+    def observe(self, label: str, value: float) -> None:
+        self._counts[label][bisect_left(self.buckets, value)] += 1
+        self._sums[label] += value
+
+    def render(self, worker: str) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} histogram",
+        ]
+        for label, counts in sorted(self._counts.items()):
+            labels = f'blueprint="{label}",worker="{worker}"'
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(
+                    f'{self.name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+                )
+            cumulative += counts[-1]
+            lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{labels}}} {self._sums[label]}")
+            lines.append(f"{self.name}_count{{{labels}}} {cumulative}")
+        return lines
+
+    def reset(self) -> None:
+        self._counts.clear()
+        self._sums.clear()
+
+
+request_duration = Histogram(
+    "hotel_request_duration_seconds", "Request wall time", DURATION_BUCKETS
+)
+db_duration = Histogram(
+    "hotel_db_duration_seconds", "Time spent in SQL statements", DURATION_BUCKETS
+)
+db_queries = Histogram(
+    "hotel_db_queries", "SQL statements executed per request", COUNT_BUCKETS
+)
+render_duration = Histogram(
+    "hotel_render_duration_seconds", "Template render time", DURATION_BUCKETS
+)
+histograms = (request_duration, db_duration, db_queries, render_duration)
+
+process_started = time.time()
+
+
+def reset_metrics_after_fork() -> None:
+    global process_started
+    process_started = time.time()
+    for histogram in histograms:
+        histogram.reset()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=reset_metrics_after_fork)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started"].pop()
+    add_timing("db", time.perf_counter() - started)
+
+
+def instrument_engine(bound: AsyncEngine) -> None:
+    event.listen(bound.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(bound.sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+engine_created.append(instrument_engine)
+for bound in engines():
+    instrument_engine(bound)
+
+
+async def _before_render_template(sender, template, context) -> None:
+    if has_request_context():
+        g.render_started = time.perf_counter()
+
+
+async def _template_rendered(sender, template, context) -> None:
+    if has_request_context() and "render_started" in g:
+        add_timing("render", time.perf_counter() - g.pop("render_started"))
+
+
+def _server_timing(total: float, timings: Dict[str, Tuple[float, int]]) -> str:
+    parts = [f"app;dur={total * 1000:.2f}"]
+    for name, (seconds, calls) in sorted(timings.items()):
+        parts.append(f'{name};dur={seconds * 1000:.2f};desc="{calls}x"')
+    return ", ".join(parts)
+
+
+def _gauges(worker: str) -> List[str]:
+    caches = current_caches()
+    lines = [
+        "# TYPE hotel_process_start_time_seconds gauge",
+        f'hotel_process_start_time_seconds{{worker="{worker}"}} {process_started}',
+    ]
+    for prefix, stats in (
+        ("hotel_db_pool", pool_stats()),
+        ("hotel_db_replica_pool", replica_pool_stats() or {}),
+        ("hotel_hashing_pool", current_hashing_pool().stats()),
+        ("hotel_user_cache", caches.current_user.stats()),
+        ("hotel_fragment_cache", caches.fragments.stats()),
+        ("hotel_reference_cache", caches.reference.stats()),
+        ("hotel_count_cache", caches.count.stats()),
+        ("hotel_invalidation_bus", current_bus().stats()),
+        ("hotel_room_board", current_board().stats()),
+    ):
+        for key, value in stats.items():
+            lines.append(f"# TYPE {prefix}_{key} gauge")
+            lines.append(f'{prefix}_{key}{{worker="{worker}"}} {value}')
+    return lines
+
+
+def render_metrics() -> str:
+    worker = str(os.getpid())
+    lines = []
+    for histogram in histograms:
+        lines.extend(histogram.render(worker))
+    lines.extend(_gauges(worker))
+    return "\n".join(lines) + "\n"
+
+
+def instrument(app: Quart) -> None:
+    before_render_template.connect(_before_render_template, app, weak=False)
+    template_rendered.connect(_template_rendered, app, weak=False)
+
+    @app.before_request
+    async def start_timer() -> None:
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    async def record_timings(response: Response) -> Response:
+        if "request_started" not in g:
+            return response
+
+        total = time.perf_counter() - g.request_started
+        timings = g.get("timings", {})
+        label = request.blueprint or "app"
+
+        db_time, db_count = timings.get("db", (0.0, 0))
+        render_time, _ = timings.get("render", (0.0, 0))
+
+        request_duration.observe(label, total)
+        db_duration.observe(label, db_time)
+        db_queries.observe(label, db_count)
+        render_duration.observe(label, render_time)
+
+        response.headers["Server-Timing"] = _server_timing(total, timings)
+        return response
@@ -1,2 +1,4 @@
 from .auth import *
+from .compression import *
+from .http_cache import *
 from .users import *
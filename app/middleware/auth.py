@@ -1,19 +1,29 @@
 from typing import Tuple, Optional
 from quart import Response, request, redirect, url_for
+from ..config import current_config
+from ..timing import timed
 from ..models import User
 from ..queries import get_current_user
 
 
+def auth_redirect() -> Response:
+    endpoint = (
+        "auth_router.refresh"
+        if current_config().stateless_tokens
+        else "auth_router.login"
+    )
+    return redirect(url_for(endpoint, next=request.url))
+
+
 async def auth_check() -> Tuple[Optional[Response], Optional[User]]:
     token = request.cookies.get("access_token")
 
     if not token:
-        next_url = request.url
-        return redirect(url_for("auth_router.login", next=next_url)), None
+        return auth_redirect(), None
 
-    current_user = await get_current_user(token)
+    async with timed("auth"):
+        current_user = await get_current_user(token)
     if current_user is None:
-        next_url = request.url
-        return redirect(url_for("auth_router.login", next=next_url)), None
+        return auth_redirect(), None
 
     return None, current_user
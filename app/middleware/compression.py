@@ -0,0 +1,122 @@
+import zlib
+from importlib.util import find_spec
+from typing import AsyncGenerator, Optional, Union
+
+from quart import Quart, Response, request
+from quart.wrappers.response import DataBody, IterableBody, ResponseBody
+
+from ..config import Config, config as conf
+
+CHUNK_SIZE = 16 * 1024
+ENCODINGS = ("br", "gzip") if find_spec("brotli") else ("gzip",)
+
+
+class GzipCompressor:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+
+class BrotliCompressor:
+    def __init__(self, quality: int):
+        import brotli
+
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.finish()
+
+
+Compressor = Union[GzipCompressor, BrotliCompressor]
+
+
+def negotiate_encoding() -> Optional[str]:
+    accepted = request.accept_encodings
+    encoding = max(ENCODINGS, key=lambda encoding: accepted[encoding])
+    return encoding if accepted[encoding] > 0 else None
+
+
+def make_compressor(encoding: str, config: Config = conf) -> Compressor:
+    if encoding == "br":
+        return BrotliCompressor(config.compress_brotli_quality)
+    return GzipCompressor(config.compress_gzip_level)
+
+
+def compress_data(data: bytes, compressor: Compressor) -> bytes:
+    return compressor.compress(data) + compressor.flush()
+
+
+async def compress_stream(
+    body: ResponseBody, compressor: Compressor
+) -> AsyncGenerator[bytes, None]:
+    async with body as chunks:
+        async for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode()
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+    yield compressor.flush()
+
+
+async def chunked(data: bytes) -> AsyncGenerator[bytes, None]:
+    for start in range(0, len(data), CHUNK_SIZE):
+        yield data[start : start + CHUNK_SIZE]
+
+
+def is_compressible(response: Response, config: Config = conf) -> bool:
+    return (
+        response.status_code == 200
+        and "Content-Encoding" not in response.headers
+        and response.mimetype in config.compress_mimetypes
+        and not response.cache_control.no_transform
+        and request.range is None
+    )
+
+
+async def compress_response(response: Response, config: Config = conf) -> Response:
+    if not is_compressible(response, config):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    length = response.content_length
+    if length is not None and length < config.compress_min_size:
+        return response
+
+    encoding = negotiate_encoding()
+    if encoding is None:
+        return response
+
+    compressor = make_compressor(encoding, config)
+    body = response.response
+    if isinstance(body, DataBody) and len(body.data) < config.compress_stream_size:
+        response.set_data(compress_data(body.data, compressor))
+    else:
+        if isinstance(body, DataBody):
+            body = IterableBody(chunked(body.data))
+        response.response = IterableBody(compress_stream(body, compressor))
+        del response.content_length
+
+    response.content_encoding = encoding
+    response.headers.pop("Accept-Ranges", None)
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def compress_responses(app: Quart, config: Config = conf) -> None:
+    if not config.compress_enabled:
+        return
+
+    @app.after_request
+    async def compress(response: Response) -> Response:
+        return await compress_response(response, config)
@@ -0,0 +1,41 @@
+import hashlib
+from datetime import datetime, timezone
+from typing import Optional
+
+from quart import Response, request
+
+
+def make_etag(*parts) -> str:
+    return hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+
+
+def http_last_modified(updated_at: Optional[datetime]) -> Optional[datetime]:
+    if updated_at is None:
+        return None
+    if updated_at.tzinfo is None:
+        updated_at = updated_at.replace(tzinfo=timezone.utc)
+    return updated_at.astimezone(timezone.utc).replace(microsecond=0)
+
+
+def is_not_modified(etag: str, last_modified: Optional[datetime]) -> bool:
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+
+    if_modified_since = request.if_modified_since
+    if last_modified is None or if_modified_since is None:
+        return False
+    return last_modified <= if_modified_since
+
+
+def set_cache_headers(
+    response: Response, etag: str, last_modified: Optional[datetime]
+) -> Response:
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+def not_modified(etag: str, last_modified: Optional[datetime]) -> Response:
+    return set_cache_headers(Response(status=304), etag, last_modified)
@@ -1,3 +1,5 @@
 from .user import *
 from .hotel import *
 from .service import *
+from .report import *
+from .version import *
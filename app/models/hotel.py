@@ -11,7 +11,9 @@ from sqlalchemy import (
     Boolean,
     DateTime,
     Float,
+    Index,
 )
+from sqlalchemy.orm import relationship
 
 from .user import Base
 
@@ -57,6 +59,14 @@ class HotelRoom(Base):
     status = Column(Enum(RoomStatus), default=RoomStatus.FREE, nullable=False)
     price = Column(Float, default=1500.00, nullable=False)
 
+    equipment = relationship(
+        "EquirementElement",
+        secondary="room_equirement_elements",
+        order_by="EquirementElement.name",
+        lazy="raise",
+        viewonly=True,
+    )
+
 
 class EquirementElement(Base):
     __tablename__ = "equirement_elements"
@@ -71,3 +81,8 @@ class RoomEquirementElement(Base):
     id = Column(Integer, primary_key=True)
     room_id = Column(Integer, ForeignKey("hotel_rooms.id"), nullable=False)
     element_id = Column(Integer, ForeignKey("equirement_elements.id"), nullable=False)
+
+    __table_args__ = (
+        Index("ix_room_equirement_elements_room_element", room_id, element_id),
+        Index("ix_room_equirement_elements_element_room", element_id, room_id),
+    )
@@ -0,0 +1,22 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, Enum, Date, DateTime, Float
+
+from .hotel import Base, RoomCategory
+
+
+class RoomDailyStats(Base):
+    __tablename__ = "room_daily_stats"
+
+    day = Column(Date, primary_key=True)
+    category = Column(Enum(RoomCategory), primary_key=True)
+    floor = Column(Integer, primary_key=True)
+    rooms_total = Column(Integer, nullable=False)
+    rooms_occupied = Column(Integer, nullable=False)
+    revenue = Column(Float, nullable=False)
+    refreshed_at = Column(DateTime, default=datetime.now, nullable=False)
+
+
+class ReportDirtyDay(Base):
+    __tablename__ = "report_dirty_days"
+
+    day = Column(Date, primary_key=True)
@@ -11,6 +11,7 @@ from sqlalchemy import (
     Boolean,
     DateTime,
     Float,
+    Index,
 )
 
 from .hotel import Base
@@ -20,12 +21,27 @@ class Order(Base):
     __tablename__ = "orders"
 
     id = Column(Integer, primary_key=True)
-    client_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    client_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     room = Column(Integer, ForeignKey("hotel_rooms.id"), nullable=False)
     arrival_date = Column(DateTime, nullable=False)
     eviction_date = Column(DateTime, nullable=False)
     is_paid = Column(Boolean, default=False)
 
+    __table_args__ = (
+        Index(
+            "ix_orders_room_eviction_date",
+            room,
+            eviction_date,
+            postgresql_include=["arrival_date"],
+        ),
+        Index(
+            "ix_orders_eviction_arrival_date",
+            eviction_date,
+            arrival_date,
+            postgresql_include=["room", "is_paid"],
+        ),
+    )
+
 
 class Service(Base):
     __tablename__ = "services"
@@ -39,5 +55,5 @@ class OrderService(Base):
     __tablename__ = "order_service"
 
     id = Column(Integer, primary_key=True)
-    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
+    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False, index=True)
     service_id = Column(Integer, ForeignKey("services.id"), nullable=False)
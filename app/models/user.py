@@ -1,12 +1,10 @@
+import time
 import uuid
 
-import bcrypt
-import jwt
 from typing import Optional, Tuple
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from enum import Enum as BaseEnum
 
-import pytz
 from sqlalchemy import (
     Column,
     ForeignKey,
@@ -17,11 +15,16 @@ from sqlalchemy import (
     CHAR,
     Boolean,
     DateTime,
+    Index,
+    func,
 )
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.hybrid import hybrid_property
 
 from ..database import Base, get_session
-from ..config import config as conf
+from ..config import current_config
+from .. import hashing
+from ..timing import timed
 
 
 class Gender(BaseEnum):
@@ -51,40 +54,109 @@ class User(Base):
     role = Column(Enum(Role), default=Role.USER, nullable=False)
     is_banned = Column(Boolean, default=False, nullable=False)
     created_at = Column(DateTime, default=datetime.now(), nullable=False)
+    updated_at = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+        server_default=func.now(),
+        nullable=False,
+    )
+
+    __table_args__ = (Index("ix_users_role_username", role, username, id),)
 
     async def set_password(self, password: str) -> None:
-        self.hashed_password = bcrypt.hashpw(
-            password.encode("utf-8"), bcrypt.gensalt()
-        ).decode("utf-8")
+        async with timed("bcrypt"):
+            self.hashed_password = await hashing.hash_password(password)
 
     async def check_password(self, password: str) -> bool:
-        return bcrypt.checkpw(
-            password.encode("utf-8"), self.hashed_password.encode("utf-8")
-        )
+        async with timed("bcrypt"):
+            return await hashing.check_password(password, self.hashed_password)
+
+    async def generate_token(self, token_lifetime: Optional[int] = None) -> str:
+        import jwt
+        import pytz
+
+        config = current_config()
+        if token_lifetime is None:
+            token_lifetime = config.token_lifetime
 
-    async def generate_token(self, token_lifetime: int = conf.token_lifetime) -> str:
         payload = {
             "identity": self.id,
             "exp": datetime.now(pytz.timezone("Europe/Moscow"))
             + timedelta(seconds=token_lifetime),
             "csrf": str(uuid.uuid4()),
         }
-        return jwt.encode(payload, conf.secret, algorithm="HS256")
+        return jwt.encode(payload, config.secret, algorithm="HS256")
 
-    @property
-    async def fullname(self) -> str:
+    async def generate_token_pair(self) -> Tuple[str, str]:
+        import jwt
+
+        config = current_config()
+        issued_at = time.time()
+        access_payload = {
+            "identity": self.id,
+            "username": self.username,
+            "role": self.role.value,
+            "type": "access",
+            "jti": uuid.uuid4().hex,
+            "iat": issued_at,
+            "exp": issued_at + config.token_lifetime,
+            "csrf": str(uuid.uuid4()),
+        }
+        refresh_payload = {
+            "identity": self.id,
+            "type": "refresh",
+            "jti": uuid.uuid4().hex,
+            "iat": issued_at,
+            "exp": issued_at + config.refresh_token_lifetime,
+            "csrf": str(uuid.uuid4()),
+        }
+        return (
+            jwt.encode(access_payload, config.secret, algorithm="HS256"),
+            jwt.encode(refresh_payload, config.secret, algorithm="HS256"),
+        )
+
+    @classmethod
+    def from_token_claims(cls, payload: dict) -> "User":
+        return cls(
+            id=payload["identity"],
+            username=payload.get("username"),
+            role=Role(payload["role"]),
+        )
+
+    @hybrid_property
+    def fullname(self) -> str:
         return self.surname + " " + self.name + " " + self.patronymic
 
-    @property
-    async def initials(self) -> str:
-        return self.surname + " " + self.name[0] + "." + self.patronymic[0] + "."
+    @fullname.inplace.expression
+    @classmethod
+    def _fullname_expression(cls):
+        return cls.surname + " " + cls.name + " " + cls.patronymic
+
+    @hybrid_property
+    def initials(self) -> str:
+        return (
+            self.surname
+            + " "
+            + "".join(part[:1] + "." for part in (self.name, self.patronymic) if part)
+        )
+
+    @initials.inplace.expression
+    @classmethod
+    def _initials_expression(cls):
+        return (
+            cls.surname
+            + " "
+            + func.coalesce(func.nullif(func.left(cls.name, 1), "") + ".", "")
+            + func.coalesce(func.nullif(func.left(cls.patronymic, 1), "") + ".", "")
+        )
 
     @property
-    async def formatted_date_of_birth(self):
+    def formatted_date_of_birth(self) -> str:
         return self.date_of_birth.strftime("%d %B %Y")
 
     @property
-    async def formatted_created_at(self):
+    def formatted_created_at(self) -> str:
         return self.created_at.strftime("%H:%M %d.%m.%Y")
 
 
@@ -93,14 +165,16 @@ class Token(Base):
 
     id = Column(Integer, primary_key=True)
     token = Column(String(256), unique=True, nullable=False)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
 
     async def verify_token(
         self, user: Optional[User]
     ) -> Tuple[Optional[object], Optional[str]]:
+        import jwt
+
         async with get_session() as session:
             try:
-                jwt.decode(self.token, conf.secret, algorithms=["HS256"])
+                jwt.decode(self.token, current_config().secret, algorithms=["HS256"])
                 return self, None
 
             except jwt.ExpiredSignatureError:
@@ -122,3 +196,18 @@ class Token(Base):
         await session.commit()
 
         return self, None
+
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+
+    jti = Column(String(64), primary_key=True)
+    user_id = Column(Integer, nullable=False)
+    expires_at = Column(DateTime(timezone=True), index=True, nullable=False)
+
+
+class UserRevocation(Base):
+    __tablename__ = "user_revocations"
+
+    user_id = Column(Integer, primary_key=True)
+    revoked_at = Column(DateTime(timezone=True), index=True, nullable=False)
@@ -0,0 +1,13 @@
+from sqlalchemy import BigInteger, Column, DateTime, String, func
+
+from ..database import Base
+
+
+class TableVersion(Base):
+    __tablename__ = "table_versions"
+
+    name = Column(String(64), primary_key=True)
+    version = Column(BigInteger, default=0, nullable=False)
+    changed_at = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
@@ -1,2 +1,4 @@
 from .user import *
 from .auth import *
+from .hotel import *
+from .report import *
@@ -1,13 +1,73 @@
-import jwt
+import time
+
+from datetime import datetime, timezone
 from typing import Tuple, Optional
 
-from sqlalchemy import select
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..config import config as conf
+from ..bus import current_bus
+from ..cache import current_caches
+from ..config import current_config
 from ..database import get_session
-from ..models import Token, User
-from ..queries import get_user_by_username
+from ..models import RevokedToken, Token, User, UserRevocation
+
+
+def utc_timestamp(value: float) -> datetime:
+    return datetime.fromtimestamp(value, timezone.utc)
+
+
+async def revoke_user_tokens(
+    session: AsyncSession, user_id: int, revoked_at: float
+) -> None:
+    statement = insert(UserRevocation).values(
+        user_id=user_id, revoked_at=utc_timestamp(revoked_at)
+    )
+    await session.execute(
+        statement.on_conflict_do_update(
+            index_elements=[UserRevocation.user_id],
+            set_={
+                "revoked_at": func.greatest(
+                    UserRevocation.revoked_at, statement.excluded.revoked_at
+                )
+            },
+        )
+    )
+
+
+async def use_refresh_token(session: AsyncSession, payload: dict) -> bool:
+    await session.execute(
+        delete(RevokedToken).where(RevokedToken.expires_at <= func.now())
+    )
+    used = await session.scalar(
+        insert(RevokedToken)
+        .values(
+            jti=payload["jti"],
+            user_id=payload["identity"],
+            expires_at=utc_timestamp(payload["exp"]),
+        )
+        .on_conflict_do_nothing()
+        .returning(RevokedToken.jti)
+    )
+    return used is not None
+
+
+async def load_token_deny_list() -> int:
+    deny_list = current_caches().deny_list
+    since = utc_timestamp(time.time() - deny_list.retention)
+    async with get_session() as session:
+        result = await session.execute(
+            select(UserRevocation.user_id, UserRevocation.revoked_at).where(
+                UserRevocation.revoked_at > since
+            )
+        )
+        revocations = result.all()
+        await session.commit()
+
+    for user_id, revoked_at in revocations:
+        deny_list.revoke_user(user_id, revoked_at.timestamp())
+    return len(revocations)
 
 
 async def get_user_token(user_id: int):
@@ -16,33 +76,146 @@ async def get_user_token(user_id: int):
         return result.scalar_one_or_none()
 
 
+def decode_stateless_token(token: str, token_type: str) -> Optional[dict]:
+    import jwt
+
+    try:
+        payload = jwt.decode(token, current_config().secret, algorithms=["HS256"])
+    except (jwt.ExpiredSignatureError, jwt.InvalidTokenError):
+        return None
+
+    if payload.get("type") != token_type or not payload.get("identity"):
+        return None
+    if current_caches().deny_list.is_revoked(payload):
+        return None
+
+    return payload
+
+
 async def get_current_user(token: str) -> Optional[User]:
+    config = current_config()
+    if config.stateless_tokens:
+        payload = decode_stateless_token(token, "access")
+        if payload is None or "role" not in payload:
+            return None
+        return User.from_token_claims(payload)
+
+    user_cache = current_caches().current_user
+    user = user_cache.get(token)
+    if user is not None:
+        return user
+
+    import jwt
+
     try:
-        payload = jwt.decode(token, conf.secret, algorithms=["HS256"])
+        payload = jwt.decode(token, config.secret, algorithms=["HS256"])
         user_id = payload.get("identity")
         if not user_id:
             return None
 
         async with get_session() as session:
             user = await session.get(User, user_id)
-            return user
+            if user is not None:
+                session.expunge(user)
     except (jwt.ExpiredSignatureError, jwt.InvalidTokenError):
         return None
 
+    if user is not None:
+        ttl = payload["exp"] - time.time() if "exp" in payload else None
+        user_cache.set(token, user, tag=user.id, ttl=ttl)
 
-async def login(
+    return user
+
+
+async def authenticate(
     session: AsyncSession, username: str, password: str
-) -> Tuple[Optional[str], Optional[str]]:
-    user, err = await get_user_by_username(username)
+) -> Tuple[Optional[User], Optional[str]]:
+    result = await session.execute(select(User).where(User.username == username))
+    user = result.scalar_one_or_none()
 
-    if err:
-        return None, err
+    await session.commit()
+
+    if user is None:
+        return None, "user not found"
 
     correct_password = await user.check_password(password)
 
     if not correct_password:
         return None, "password is incorrect"
 
+    return user, None
+
+
+async def stateless_login(
+    session: AsyncSession, username: str, password: str
+) -> Tuple[Optional[Tuple[str, str]], Optional[str]]:
+    user, err = await authenticate(session, username, password)
+
+    if err:
+        return None, err
+
+    return await user.generate_token_pair(), None
+
+
+async def refresh_tokens(
+    refresh_token: Optional[str],
+) -> Tuple[Optional[Tuple[str, str]], Optional[str]]:
+    if not refresh_token:
+        return None, "refresh token is missing"
+
+    import jwt
+
+    try:
+        payload = jwt.decode(
+            refresh_token, current_config().secret, algorithms=["HS256"]
+        )
+    except (jwt.ExpiredSignatureError, jwt.InvalidTokenError):
+        return None, "refresh token is invalid"
+
+    if payload.get("type") != "refresh" or not payload.get("identity"):
+        return None, "refresh token is invalid"
+
+    deny_list = current_caches().deny_list
+    if deny_list.is_revoked(payload) and payload.get("jti") not in deny_list:
+        return None, "refresh token has been revoked"
+
+    async with get_session() as session:
+        user = await session.get(User, payload["identity"])
+        revoked_at = await session.scalar(
+            select(UserRevocation.revoked_at).where(
+                UserRevocation.user_id == payload["identity"]
+            )
+        )
+        if revoked_at is not None and payload.get("iat", 0) <= revoked_at.timestamp():
+            await session.commit()
+            return None, "refresh token has been revoked"
+
+        if not await use_refresh_token(session, payload):
+            revoked_at = time.time()
+            await revoke_user_tokens(session, payload["identity"], revoked_at)
+            await session.commit()
+            await current_bus().publish(
+                "user_revoked", id=payload["identity"], at=revoked_at
+            )
+            return None, "refresh token has been revoked"
+
+        await session.commit()
+
+    if user is None:
+        return None, "user not found"
+
+    await current_bus().publish("token_revoked", jti=payload["jti"], exp=payload["exp"])
+    return await user.generate_token_pair(), None
+
+
+async def login(
+    session: AsyncSession, username: str, password: str
+) -> Tuple[Optional[str], Optional[str]]:
+    user, err = await authenticate(session, username, password)
+
+    if err:
+        return None, err
+
     token = await get_user_token(user.id)
 
     if token is None:
@@ -0,0 +1,221 @@
+import time
+import random
+import asyncio
+from datetime import datetime
+from dataclasses import dataclass
+from typing import Tuple, Optional, List, Sequence
+
+from sqlalchemy import and_, exists, func
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.future import select
+from sqlalchemy.orm import load_only, selectinload
+
+from ..bus import current_bus
+from ..cache import current_caches
+from ..database import get_read_session, get_session
+from ..models import (
+    EquirementElement,
+    HotelRoom,
+    RoomCategory,
+    RoomEquirementElement,
+    RoomStatus,
+    Order,
+)
+
+ROOMS_PAGE_SIZE = 50
+ROOMS_PAGE_SIZE_MAX = 200
+
+BOOKING_RETRIES = 5
+BOOKING_BACKOFF = 0.05
+RETRYABLE_SQLSTATES = ("40001", "40P01", "55P03")
+
+
+@dataclass
+class RoomsPage:
+    rooms: List[HotelRoom]
+    next_cursor: Optional[int]
+
+
+def stay_overlaps(arrival_date: datetime, eviction_date: datetime):
+    return and_(
+        Order.eviction_date > arrival_date,
+        Order.arrival_date < eviction_date,
+    )
+
+
+async def get_available_rooms(
+    arrival_date: datetime,
+    eviction_date: datetime,
+    category: Optional[RoomCategory] = None,
+    floor: Optional[int] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+) -> Tuple[Optional[List[HotelRoom]], Optional[str]]:
+    if eviction_date <= arrival_date:
+        return None, "eviction date must be after arrival date"
+
+    query = select(HotelRoom).where(
+        ~exists().where(
+            Order.room == HotelRoom.id,
+            stay_overlaps(arrival_date, eviction_date),
+        )
+    )
+
+    if category is not None:
+        query = query.where(HotelRoom.category == category)
+    if floor is not None:
+        query = query.where(HotelRoom.floor == floor)
+    if min_price is not None:
+        query = query.where(HotelRoom.price >= min_price)
+    if max_price is not None:
+        query = query.where(HotelRoom.price <= max_price)
+
+    async with get_read_session() as session:
+        result = await session.execute(
+            query.order_by(HotelRoom.price, HotelRoom.floor, HotelRoom.id)
+        )
+        rooms = result.scalars().all()
+
+    if not rooms:
+        return None, "no rooms available for these dates"
+
+    return rooms, None
+
+
+async def get_equipment() -> List[EquirementElement]:
+    equipment = current_caches().reference.get("equipment")
+    if equipment is not None:
+        return equipment
+
+    async with get_read_session() as session:
+        result = await session.scalars(
+            select(EquirementElement).order_by(EquirementElement.name)
+        )
+        equipment = result.all()
+
+    current_caches().reference.set("equipment", equipment, tag="equipment")
+    return equipment
+
+
+def rooms_with_equipment(element_ids: Sequence[int]):
+    return (
+        select(RoomEquirementElement.room_id)
+        .where(RoomEquirementElement.element_id.in_(element_ids))
+        .group_by(RoomEquirementElement.room_id)
+        .having(
+            func.count(func.distinct(RoomEquirementElement.element_id))
+            == len(set(element_ids))
+        )
+    )
+
+
+async def get_rooms_catalogue(
+    after: Optional[int] = None,
+    limit: int = ROOMS_PAGE_SIZE,
+    equipment: Sequence[int] = (),
+    category: Optional[RoomCategory] = None,
+    floor: Optional[int] = None,
+) -> Tuple[Optional[RoomsPage], Optional[str]]:
+    limit = max(1, min(limit, ROOMS_PAGE_SIZE_MAX))
+
+    query = select(HotelRoom).options(selectinload(HotelRoom.equipment))
+
+    if equipment:
+        query = query.where(HotelRoom.id.in_(rooms_with_equipment(equipment)))
+    if category is not None:
+        query = query.where(HotelRoom.category == category)
+    if floor is not None:
+        query = query.where(HotelRoom.floor == floor)
+    if after is not None:
+        query = query.where(HotelRoom.id > after)
+
+    async with get_read_session() as session:
+        result = await session.scalars(query.order_by(HotelRoom.id).limit(limit + 1))
+        rooms = result.all()
+
+    if not rooms:
+        return None, "no rooms match these filters"
+
+    next_cursor = rooms[limit - 1].id if len(rooms) > limit else None
+    return RoomsPage(rooms=rooms[:limit], next_cursor=next_cursor), None
+
+
+async def get_room_statuses() -> List[HotelRoom]:
+    async with get_read_session() as session:
+        result = await session.scalars(
+            select(HotelRoom)
+            .options(
+                load_only(
+                    HotelRoom.id, HotelRoom.name, HotelRoom.floor, HotelRoom.status
+                )
+            )
+            .order_by(HotelRoom.floor, HotelRoom.id)
+        )
+        return result.all()
+
+
+async def set_room_status(
+    room_id: int, status: RoomStatus
+) -> Tuple[Optional[HotelRoom], Optional[str]]:
+    async with get_session() as session:
+        room = await session.get(HotelRoom, room_id)
+        if room is None:
+            return None, "room not found"
+
+        room.status = status
+        await session.commit()
+
+    await current_bus().publish(
+        "room_status", id=room_id, status=status.value, at=time.time()
+    )
+    return room, None
+
+
+async def create_order(
+    client_id: int, room_id: int, arrival_date: datetime, eviction_date: datetime
+) -> Tuple[Optional[Order], Optional[str]]:
+    if eviction_date <= arrival_date:
+        return None, "eviction date must be after arrival date"
+
+    async with get_session() as session:
+        for attempt in range(BOOKING_RETRIES):
+            try:
+                room = await session.scalar(
+                    select(HotelRoom).where(HotelRoom.id == room_id).with_for_update()
+                )
+                if room is None:
+                    await session.commit()
+                    return None, "room not found"
+
+                booked = await session.scalar(
+                    select(
+                        exists().where(
+                            Order.room == room_id,
+                            stay_overlaps(arrival_date, eviction_date),
+                        )
+                    )
+                )
+                if booked:
+                    await session.commit()
+                    return None, "room is already booked for these dates"
+
+                order = Order(
+                    client_id=client_id,
+                    room=room_id,
+                    arrival_date=arrival_date,
+                    eviction_date=eviction_date,
+                )
+                session.add(order)
+                await session.commit()
+                return order, None
+
+            except DBAPIError as e:
+                await session.rollback()
+                sqlstate = getattr(e.orig, "sqlstate", None)
+                if sqlstate not in RETRYABLE_SQLSTATES:
+                    raise
+
+                delay = BOOKING_BACKOFF * 2**attempt
+                await asyncio.sleep(random.uniform(0, delay))
+
+    return None, "room is busy, please try again"
@@ -0,0 +1,203 @@
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import delete, func, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from ..config import current_config
+from ..database import get_read_session, get_session
+from ..models import Order, ReportDirtyDay, RoomDailyStats
+
+REPORT_GROUPS = ("category", "floor")
+REPORT_RANGE_MAX = 3660
+REPORT_REFRESH_LOCK = 7_020_001
+
+REFRESH_ROOM_DAILY_STATS = text(
+    """
+WITH nights AS (
+    SELECT orders.room, nights.day, bool_or(orders.is_paid) AS paid
+    FROM orders
+    CROSS JOIN LATERAL generate_series(
+        date_trunc('day', orders.arrival_date),
+        orders.eviction_date - interval '1 microsecond',
+        interval '1 day'
+    ) AS nights(day)
+    WHERE orders.eviction_date > CAST(:start AS timestamp)
+        AND orders.arrival_date < CAST(:end AS timestamp)
+        AND nights.day >= CAST(:start AS timestamp)
+        AND nights.day < CAST(:end AS timestamp)
+    GROUP BY orders.room, nights.day
+)
+INSERT INTO room_daily_stats (
+    day, category, floor, rooms_total, rooms_occupied, revenue, refreshed_at
+)
+SELECT
+    days.day::date, rooms.category, rooms.floor,
+    count(*),
+    count(nights.room),
+    coalesce(sum(rooms.price) FILTER (WHERE nights.paid), 0),
+    now()
+FROM generate_series(
+    CAST(:start AS timestamp), CAST(:end AS timestamp) - interval '1 day', interval '1 day'
+) AS days(day)
+CROSS JOIN hotel_rooms AS rooms
+LEFT JOIN nights ON nights.room = rooms.id AND nights.day = days.day
+GROUP BY days.day, rooms.category, rooms.floor
+"""
+)
+
+MARK_MISSING_REPORT_DAYS = text(
+    """
+INSERT INTO report_dirty_days (day)
+SELECT days.day::date
+FROM generate_series(
+    CAST(:start AS timestamp), CAST(:end AS timestamp) - interval '1 day', interval '1 day'
+) AS days(day)
+WHERE NOT EXISTS (
+    SELECT 1 FROM room_daily_stats WHERE room_daily_stats.day = days.day::date
+)
+ON CONFLICT DO NOTHING
+"""
+)
+
+
+@dataclass
+class OccupancyRow:
+    day: date
+    group: str
+    rooms_total: int
+    rooms_occupied: int
+    revenue: float
+
+    @property
+    def occupancy(self) -> float:
+        return self.rooms_occupied / self.rooms_total if self.rooms_total else 0.0
+
+
+def day_ranges(days: List[date]) -> Iterator[Tuple[date, date]]:
+    start = end = None
+    for day in sorted(days):
+        if end is not None and day == end:
+            end += timedelta(days=1)
+            continue
+        if start is not None:
+            yield start, end
+        start, end = day, day + timedelta(days=1)
+    if start is not None:
+        yield start, end
+
+
+async def lock_report_refresh(session: AsyncSession) -> bool:
+    return await session.scalar(
+        select(func.pg_try_advisory_xact_lock(REPORT_REFRESH_LOCK))
+    )
+
+
+async def rebuild_room_daily_stats(
+    session: AsyncSession, start: date, end: date
+) -> int:
+    await session.execute(
+        delete(RoomDailyStats).where(
+            RoomDailyStats.day >= start, RoomDailyStats.day < end
+        )
+    )
+    result = await session.execute(
+        REFRESH_ROOM_DAILY_STATS, {"start": start, "end": end}
+    )
+    return result.rowcount
+
+
+async def refresh_room_daily_stats(start: date, end: date) -> Optional[int]:
+    async with get_session() as session:
+        if not await lock_report_refresh(session):
+            await session.rollback()
+            return None
+
+        rows = await rebuild_room_daily_stats(session, start, end)
+        await session.commit()
+        return rows
+
+
+async def refresh_recent_stats() -> Optional[int]:
+    config = current_config()
+    today = date.today()
+
+    async with get_session() as session:
+        if not await lock_report_refresh(session):
+            await session.rollback()
+            return None
+
+        await session.execute(
+            MARK_MISSING_REPORT_DAYS,
+            {
+                "start": today - timedelta(days=config.report_refresh_past_days),
+                "end": today + timedelta(days=config.report_refresh_future_days),
+            },
+        )
+        result = await session.scalars(
+            delete(ReportDirtyDay).returning(ReportDirtyDay.day)
+        )
+
+        rows = 0
+        for start, end in day_ranges(result.all()):
+            rows += await rebuild_room_daily_stats(session, start, end)
+        await session.commit()
+        return rows
+
+
+async def refresh_all_stats() -> Optional[int]:
+    async with get_session() as session:
+        first, last = (
+            await session.execute(
+                select(func.min(Order.arrival_date), func.max(Order.eviction_date))
+            )
+        ).one()
+
+    if first is None:
+        return 0
+    return await refresh_room_daily_stats(first.date(), last.date() + timedelta(days=1))
+
+
+async def get_occupancy_report(
+    start: date, end: date, group: str = "category"
+) -> Tuple[Optional[List[OccupancyRow]], Optional[str]]:
+    if end <= start:
+        return None, "end date must be after start date"
+    if (end - start).days > REPORT_RANGE_MAX:
+        return None, f"report range is limited to {REPORT_RANGE_MAX} days"
+    if group not in REPORT_GROUPS:
+        return None, "invalid report grouping"
+
+    column = getattr(RoomDailyStats, group)
+    query = (
+        select(
+            RoomDailyStats.day,
+            column,
+            func.sum(RoomDailyStats.rooms_total),
+            func.sum(RoomDailyStats.rooms_occupied),
+            func.sum(RoomDailyStats.revenue),
+        )
+        .where(RoomDailyStats.day >= start, RoomDailyStats.day < end)
+        .group_by(RoomDailyStats.day, column)
+        .order_by(RoomDailyStats.day, column)
+    )
+
+    async with get_read_session() as session:
+        result = await session.execute(query)
+        rows = [
+            OccupancyRow(
+                day=day,
+                group=value.value if group == "category" else str(value),
+                rooms_total=rooms_total,
+                rooms_occupied=rooms_occupied,
+                revenue=revenue,
+            )
+            for day, value, rooms_total, rooms_occupied, revenue in result
+        ]
+
+    if not rows:
+        return None, "no report data for this period"
+
+    return rows, None
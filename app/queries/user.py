@@ -1,15 +1,52 @@
+import json
+import time
+import base64
+import binascii
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Tuple, Optional, List
+from typing import AsyncGenerator, Tuple, Optional, List
 
+from sqlalchemy import Row, func, insert, tuple_
 from sqlalchemy.future import select
+from sqlalchemy.orm import load_only
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..database import get_session
-from ..models import User, Role, Gender
+from ..bus import current_bus
+from ..cache import current_caches
+from ..config import current_config
+from ..database import get_read_session, get_session
+from ..models import User, Role, Gender, TableVersion
+from .auth import revoke_user_tokens
+
+USERS_PAGE_SIZE = 50
+USERS_PAGE_SIZE_MAX = 200
+
+
+@dataclass
+class UsersPage:
+    users: List[User] = field(default_factory=list)
+    total: int = 0
+    estimated: bool = False
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+
+def encode_cursor(user: User) -> str:
+    raw = json.dumps([user.username, user.id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Optional[Tuple[str, int]]:
+    try:
+        username, user_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return str(username), int(user_id)
+    except (binascii.Error, ValueError, TypeError):
+        return None
 
 
 async def get_user_by_username(username: str) -> Tuple[Optional[User], Optional[str]]:
-    async with get_session() as session:
+    async with get_read_session() as session:
         result = await session.execute(select(User).where(User.username == username))
         user = result.scalar_one_or_none()
 
@@ -33,18 +70,180 @@ async def get_user_by_id(
         return session, user, None
 
 
-async def get_users_list() -> Tuple[Optional[List[User]], Optional[str]]:
+async def get_users_version() -> Tuple[Optional[datetime], int]:
+    async with get_read_session() as session:
+        result = await session.execute(
+            select(TableVersion.changed_at, TableVersion.version).where(
+                TableVersion.name == User.__tablename__
+            )
+        )
+        row = result.one_or_none()
+        return (row.changed_at, row.version) if row else (None, 0)
+
+
+async def get_user_version(user_id: int) -> Optional[datetime]:
     async with get_session() as session:
         result = await session.execute(
-            select(User).where(User.role == Role.USER).order_by(User.username)
+            select(User.updated_at).where(User.id == user_id)
+        )
+        return result.scalar_one_or_none()
+
+
+async def count_users(session: AsyncSession, filters: list) -> Tuple[int, bool]:
+    connection = await session.connection()
+    statement = select(User.id).where(*filters)
+    compiled = statement.compile(
+        dialect=connection.dialect, compile_kwargs={"literal_binds": True}
+    )
+    result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}")
+    estimate = int(result.scalar()[0]["Plan"]["Plan Rows"])
+    if estimate >= current_config().count_estimate_threshold:
+        return estimate, True
+
+    total = await session.scalar(select(func.count()).select_from(User).where(*filters))
+    return total, False
+
+
+async def get_users_list(
+    after: Optional[str] = None,
+    before: Optional[str] = None,
+    limit: int = USERS_PAGE_SIZE,
+    role: Optional[Role] = Role.USER,
+    gender: Optional[Gender] = None,
+    search: Optional[str] = None,
+    descending: bool = False,
+) -> Tuple[Optional[UsersPage], Optional[str]]:
+    limit = max(1, min(limit, USERS_PAGE_SIZE_MAX))
+
+    filters = []
+    if role is not None:
+        filters.append(User.role == role)
+    if gender is not None:
+        filters.append(User.gender == gender)
+    if search:
+        filters.append(User.username.startswith(search, autoescape=True))
+
+    key = tuple_(User.username, User.id)
+    cursor = decode_cursor(before or after) if (before or after) else None
+    if (before or after) and cursor is None:
+        return None, "invalid page cursor"
+
+    backwards = before is not None
+    reverse = descending != backwards
+
+    query = (
+        select(User)
+        .options(
+            load_only(
+                User.id,
+                User.username,
+                User.surname,
+                User.name,
+                User.patronymic,
+                User.gender,
+                User.role,
+                User.updated_at,
+            )
+        )
+        .where(*filters)
+    )
+    if cursor is not None:
+        query = query.where(key < cursor if reverse else key > cursor)
+
+    if reverse:
+        query = query.order_by(User.username.desc(), User.id.desc())
+    else:
+        query = query.order_by(User.username, User.id)
+
+    async with get_read_session() as session:
+        version = await session.scalar(
+            select(TableVersion.version).where(TableVersion.name == User.__tablename__)
         )
+        count_key = (version, role, gender, search or None)
+        count = current_caches().count.get(count_key) if version is not None else None
+        if count is None:
+            count = await count_users(session, filters)
+            if version is not None:
+                current_caches().count.set(count_key, count)
+        total, estimated = count
+
+        result = await session.stream_scalars(query.limit(limit + 1))
+        users = [user async for user in result]
+
+    if not users:
+        return None, "users list is empty"
+
+    has_more = len(users) > limit
+    users = users[:limit]
+    if backwards:
+        users.reverse()
+
+    page = UsersPage(users=users, total=total, estimated=estimated)
+    if has_more or backwards:
+        page.next_cursor = encode_cursor(users[-1])
+    if cursor is not None and (has_more or not backwards):
+        page.prev_cursor = encode_cursor(users[0])
+
+    return page, None
 
-        users = result.scalars().all()
 
-        if not users:
-            return None, "users list is empty"
+USER_IMPORT_FIELDS = (
+    "username",
+    "hashed_password",
+    "name",
+    "surname",
+    "patronymic",
+    "date_of_birth",
+    "phone_number",
+    "registration_address",
+    "gender",
+    "role",
+)
 
-        return users, None
+USER_EXPORT_COLUMNS = (
+    User.id,
+    User.username,
+    User.surname,
+    User.name,
+    User.patronymic,
+    User.date_of_birth,
+    User.phone_number,
+    User.registration_address,
+    User.gender,
+    User.role,
+    User.is_banned,
+    User.created_at,
+)
+
+
+async def create_users(users: List[User]) -> Tuple[int, Optional[str]]:
+    if not users:
+        return 0, None
+
+    rows = [
+        {field: getattr(user, field) for field in USER_IMPORT_FIELDS} for user in users
+    ]
+
+    async with get_session() as session:
+        try:
+            await session.execute(insert(User), rows)
+            await session.commit()
+        except IntegrityError:
+            await session.rollback()
+            return 0, "User with this username or phone number is already there"
+
+    return len(rows), None
+
+
+async def stream_users(batch_size: int = 1000) -> AsyncGenerator[Row, None]:
+    async with get_read_session() as session:
+        result = await session.stream(
+            select(*USER_EXPORT_COLUMNS)
+            .order_by(User.id)
+            .execution_options(yield_per=batch_size)
+        )
+        async for row in result:
+            yield row
 
 
 async def create_user(new_user: User) -> Tuple[bool, Optional[str]]:
@@ -74,10 +273,18 @@ async def update_user(
         "registration_address", user.registration_address
     )
     user.gender = Gender(data.get("gender", user.gender))
-    user.role = Role(data.get("role", user.role))
+    role = Role(data.get("role", user.role))
+    role_changed = role != user.role
+    user.role = role
+    revoked_at = time.time()
 
     await session.merge(user)
+    if role_changed:
+        await revoke_user_tokens(session, user.id, revoked_at)
     await session.commit()
+    await current_bus().publish("user", id=user.id)
+    if role_changed:
+        await current_bus().publish("user_revoked", id=user.id, at=revoked_at)
     return True, None
 
 
@@ -87,6 +294,10 @@ async def delete_user(user_id: int) -> Tuple[bool, Optional[str]]:
     if err:
         return False, err
 
+    revoked_at = time.time()
     await session.delete(user)
+    await revoke_user_tokens(session, user_id, revoked_at)
     await session.commit()
+    await current_bus().publish("user", id=user_id)
+    await current_bus().publish("user_revoked", id=user_id, at=revoked_at)
     return True, None
@@ -1,3 +1,6 @@
 from .index import index_router
 from .auth import auth_router
 from .users import users_router
+from .rooms import rooms_router
+from .reports import reports_router
+from .system import system_router
@@ -1,7 +1,8 @@
 from urllib.parse import unquote
 from quart import Blueprint, render_template, request, redirect, url_for
-from quart_jwt_extended import set_access_cookies
+from quart_jwt_extended import set_access_cookies, set_refresh_cookies
 
+from ..config import current_config
 from ..database import get_session
 from .. import queries as qr
 
@@ -19,19 +20,43 @@ async def login():
         password = form.get("password")
 
         async with get_session() as session:
-            token, err = await qr.login(session, username, password)
+            if current_config().stateless_tokens:
+                tokens, err = await qr.stateless_login(session, username, password)
+            else:
+                token, err = await qr.login(session, username, password)
+                tokens = (token, None)
 
         if err:
             error_message = err
         else:
-            external_token = token
+            external_token, refresh_token = tokens
 
             next_url = unquote(next_url)
             resp = redirect(next_url)
 
             set_access_cookies(resp, external_token)
+            if refresh_token:
+                set_refresh_cookies(resp, refresh_token)
             return resp
 
     return await render_template(
         "login.html", next=next_url, error_message=error_message
     )
+
+
+@auth_router.route("/refresh")
+async def refresh():
+    next_url = request.args.get("next", url_for("index.index"))
+
+    tokens, err = await qr.refresh_tokens(request.cookies.get("refresh_token"))
+
+    if err:
+        return redirect(url_for("auth_router.login", next=next_url))
+
+    external_token, refresh_token = tokens
+
+    resp = redirect(unquote(next_url))
+
+    set_access_cookies(resp, external_token)
+    set_refresh_cookies(resp, refresh_token)
+    return resp
@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta
+from quart import Blueprint, render_template, jsonify, request
+from ..middleware import auth_check, role_check
+from ..models import Role
+from ..queries import get_occupancy_report
+
+reports_router = Blueprint("reports_router", __name__)
+
+
+@reports_router.route("/reports/occupancy")
+async def occupancy():
+    auth_redirect, current_user = await auth_check()
+    if auth_redirect:
+        return auth_redirect
+
+    message = await role_check(
+        current_user.role, [Role.ADMIN], "only the admin has access"
+    )
+    if message:
+        return jsonify({"message": message})
+
+    args = request.args
+    today = datetime.now().date()
+    filters = {
+        "start": args.get("start", (today - timedelta(days=30)).isoformat()),
+        "end": args.get("end", (today + timedelta(days=1)).isoformat()),
+        "group": args.get("group", "category"),
+    }
+
+    try:
+        start = datetime.strptime(filters["start"], "%Y-%m-%d").date()
+        end = datetime.strptime(filters["end"], "%Y-%m-%d").date()
+    except ValueError:
+        return jsonify({"error": "invalid report parameters"})
+
+    rows, err = await get_occupancy_report(start, end, filters["group"])
+
+    if args.get("format") == "json":
+        if err:
+            return jsonify({"error": err})
+        return jsonify(
+            [
+                {
+                    "day": row.day.isoformat(),
+                    filters["group"]: row.group,
+                    "rooms_total": row.rooms_total,
+                    "rooms_occupied": row.rooms_occupied,
+                    "occupancy": round(row.occupancy, 4),
+                    "revenue": row.revenue,
+                }
+                for row in rows
+            ]
+        )
+
+    context = {
+        "title": "Occupancy Report",
+        "current_user": current_user,
+        "objects": rows,
+        "filters": filters,
+        "total_revenue": sum(row.revenue for row in rows) if rows else 0,
+        "error_message": err.capitalize() if err else None,
+    }
+
+    return await render_template("reports_occupancy.html", **context)
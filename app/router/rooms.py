@@ -0,0 +1,287 @@
+import json
+import asyncio
+from datetime import datetime, timedelta
+from quart import (
+    Blueprint,
+    Response,
+    render_template,
+    stream_with_context,
+    jsonify,
+    request,
+    redirect,
+    url_for,
+)
+from ..board import current_board
+from ..config import current_config
+from ..middleware import auth_check, role_check
+from ..models import HotelRoom, Role, RoomCategory, RoomStatus
+from ..queries import (
+    ROOMS_PAGE_SIZE,
+    get_available_rooms,
+    get_equipment,
+    get_room_statuses,
+    get_rooms_catalogue,
+    set_room_status,
+    create_order,
+)
+
+rooms_router = Blueprint("rooms_router", __name__)
+
+
+def room_to_dict(room: HotelRoom) -> dict:
+    return {
+        "id": room.id,
+        "name": room.name,
+        "description": room.description,
+        "category": room.category.value,
+        "floor": room.floor,
+        "status": room.status.value,
+        "price": room.price,
+        "equipment": [element.name for element in room.equipment],
+    }
+
+
+@rooms_router.route("/rooms")
+async def catalogue():
+    auth_redirect, current_user = await auth_check()
+    if auth_redirect:
+        return auth_redirect
+
+    args = request.args
+    filters = {
+        "equipment": args.getlist("equipment"),
+        "category": args.get("category", ""),
+        "floor": args.get("floor", ""),
+        "limit": args.get("limit", ROOMS_PAGE_SIZE),
+    }
+
+    try:
+        after = int(args["after"]) if args.get("after") else None
+        limit = int(filters["limit"])
+        equipment = [int(element_id) for element_id in filters["equipment"]]
+        category = RoomCategory[filters["category"]] if filters["category"] else None
+        floor = int(filters["floor"]) if filters["floor"] else None
+    except (ValueError, KeyError):
+        return jsonify({"error": "invalid filter parameters"})
+
+    page, err = await get_rooms_catalogue(
+        after=after,
+        limit=limit,
+        equipment=equipment,
+        category=category,
+        floor=floor,
+    )
+
+    if args.get("format") == "json":
+        if err:
+            return jsonify({"error": err})
+        return jsonify(
+            {
+                "rooms": [room_to_dict(room) for room in page.rooms],
+                "next_cursor": page.next_cursor,
+            }
+        )
+
+    context = {
+        "title": "Rooms",
+        "current_user": current_user,
+        "objects": page.rooms if page else None,
+        "page": page,
+        "filters": filters,
+        "selected_equipment": set(equipment),
+        "equipment": await get_equipment(),
+        "categories": RoomCategory,
+        "error_message": err.capitalize() if err else None,
+    }
+
+    return await render_template("rooms_catalogue.html", **context)
+
+
+@rooms_router.route("/rooms/available")
+async def available():
+    auth_redirect, current_user = await auth_check()
+    if auth_redirect:
+        return auth_redirect
+
+    args = request.args
+    today = datetime.now().date()
+    filters = {
+        "arrival_date": args.get("arrival_date", today.isoformat()),
+        "eviction_date": args.get(
+            "eviction_date", (today + timedelta(days=1)).isoformat()
+        ),
+        "category": args.get("category", ""),
+        "floor": args.get("floor", ""),
+        "min_price": args.get("min_price", ""),
+        "max_price": args.get("max_price", ""),
+    }
+
+    try:
+        arrival_date = datetime.strptime(filters["arrival_date"], "%Y-%m-%d")
+        eviction_date = datetime.strptime(filters["eviction_date"], "%Y-%m-%d")
+        category = RoomCategory[filters["category"]] if filters["category"] else None
+        floor = int(filters["floor"]) if filters["floor"] else None
+        min_price = float(filters["min_price"]) if filters["min_price"] else None
+        max_price = float(filters["max_price"]) if filters["max_price"] else None
+    except (ValueError, KeyError):
+        return jsonify({"error": "invalid search parameters"})
+
+    rooms, err = await get_available_rooms(
+        arrival_date,
+        eviction_date,
+        category=category,
+        floor=floor,
+        min_price=min_price,
+        max_price=max_price,
+    )
+
+    context = {
+        "title": "Available Rooms",
+        "current_user": current_user,
+        "objects": rooms,
+        "filters": filters,
+        "categories": RoomCategory,
+        "error_message": err.capitalize() if err else None,
+    }
+
+    return await render_template("rooms_available.html", **context)
+
+
+@rooms_router.route("/rooms/book", methods=["POST"])
+async def book():
+    auth_redirect, current_user = await auth_check()
+    if auth_redirect:
+        return auth_redirect
+
+    form = await request.form
+    try:
+        room_id = int(form.get("room_id"))
+        arrival_date = datetime.strptime(form.get("arrival_date"), "%Y-%m-%d")
+        eviction_date = datetime.strptime(form.get("eviction_date"), "%Y-%m-%d")
+    except (TypeError, ValueError):
+        return jsonify({"error": "invalid booking parameters"})
+
+    _, err = await create_order(current_user.id, room_id, arrival_date, eviction_date)
+
+    if err:
+        return jsonify({"error": err})
+
+    return redirect(
+        url_for(
+            "rooms_router.available",
+            arrival_date=form.get("arrival_date"),
+            eviction_date=form.get("eviction_date"),
+        )
+    )
+
+
+def room_status_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+def room_status_snapshot(rooms) -> str:
+    return room_status_event(
+        "snapshot", [{"id": room.id, "status": room.status.value} for room in rooms]
+    )
+
+
+@rooms_router.route("/rooms/board")
+async def board():
+    auth_redirect, current_user = await auth_check()
+    if auth_redirect:
+        return auth_redirect
+
+    message = await role_check(current_user.role, [Role.ADMIN, Role.USER])
+    if message:
+        return jsonify({"message": message})
+
+    rooms = await get_room_statuses()
+
+    context = {
+        "title": "Room Status Board",
+        "current_user": current_user,
+        "objects": rooms,
+        "statuses": RoomStatus,
+        "error_message": None if rooms else "No rooms yet",
+    }
+
+    return await render_template("rooms_board.html", **context)
+
+
+@rooms_router.route("/rooms/status/stream")
+async def status_stream():
+    auth_redirect, current_user = await auth_check()
+    if auth_redirect:
+        return auth_redirect
+
+    message = await role_check(current_user.role, [Role.ADMIN, Role.USER])
+    if message:
+        return jsonify({"message": message})
+
+    board = current_board()
+    heartbeat = current_config().board_heartbeat
+    queue = board.subscribe()
+    try:
+        snapshot = room_status_snapshot(await get_room_statuses())
+    except Exception:
+        board.unsubscribe(queue)
+        raise
+
+    @stream_with_context
+    async def events():
+        try:
+            yield snapshot
+            while True:
+                try:
+                    change = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+
+                if change["kind"] == "resync":
+                    yield room_status_snapshot(await get_room_statuses())
+                    continue
+
+                yield room_status_event(
+                    "status",
+                    {
+                        "id": change["id"],
+                        "status": change["status"],
+                        "at": change["at"],
+                    },
+                )
+        finally:
+            board.unsubscribe(queue)
+
+    response = Response(
+        events(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+    response.timeout = None
+    return response
+
+
+@rooms_router.route("/rooms/status", methods=["POST"])
+async def change_status():
+    auth_redirect, current_user = await auth_check()
+    if auth_redirect:
+        return auth_redirect
+
+    message = await role_check(current_user.role, [Role.ADMIN, Role.USER])
+    if message:
+        return jsonify({"message": message})
+
+    form = await request.form
+    try:
+        room_id = int(form.get("room_id"))
+        status = RoomStatus(form.get("status"))
+    except (TypeError, ValueError):
+        return jsonify({"error": "invalid status parameters"})
+
+    _, err = await set_room_status(room_id, status)
+
+    if err:
+        return jsonify({"error": err})
+
+    return redirect(url_for("rooms_router.board"))
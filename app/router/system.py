@@ -0,0 +1,45 @@
+import hmac
+
+from quart import Blueprint, Response, jsonify, request
+from ..config import current_config
+from ..database import pool_stats
+from ..metrics import render_metrics
+from ..middleware import auth_check, role_check
+from ..models import Role
+
+system_router = Blueprint("system_router", __name__)
+
+
+@system_router.route("/system/pool")
+async def pool():
+    auth_redirect, current_user = await auth_check()
+    if auth_redirect:
+        return auth_redirect
+
+    message = await role_check(
+        current_user.role, [Role.ADMIN], "only the admin has access"
+    )
+    if message:
+        return jsonify({"message": message})
+
+    return jsonify(pool_stats())
+
+
+@system_router.route("/metrics")
+async def metrics():
+    authorization = request.headers.get("Authorization", "")
+    metrics_token = current_config().metrics_token
+    if not metrics_token or not hmac.compare_digest(
+        authorization, f"Bearer {metrics_token}"
+    ):
+        auth_redirect, current_user = await auth_check()
+        if auth_redirect:
+            return auth_redirect
+
+        message = await role_check(
+            current_user.role, [Role.ADMIN], "only the admin has access"
+        )
+        if message:
+            return jsonify({"message": message})
+
+    return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
@@ -1,14 +1,48 @@
-from quart import Blueprint, render_template, jsonify, request, redirect, url_for
-from ..middleware import auth_check, role_check
-from ..models import Role
+from quart import (
+    Blueprint,
+    Response,
+    render_template,
+    jsonify,
+    make_response,
+    request,
+    stream_with_context,
+    redirect,
+    url_for,
+)
+from werkzeug.exceptions import RequestEntityTooLarge
+
+from ..bulk import (
+    IMPORT_BATCH_SIZE,
+    batched,
+    csv_header,
+    detect_format,
+    format_row,
+    read_rows,
+)
+from ..config import current_config
+from ..middleware import (
+    auth_check,
+    role_check,
+    http_last_modified,
+    is_not_modified,
+    make_etag,
+    not_modified,
+    set_cache_headers,
+)
+from ..models import Role, Gender
 from ..queries import (
+    USERS_PAGE_SIZE,
     get_users_list,
+    get_users_version,
+    get_user_version,
     create_user,
+    create_users,
+    stream_users,
     get_user_by_id,
     update_user,
     delete_user,
 )
-from ..validators import UserValidator, UserUpdateValidator
+from ..validators import UserValidator, UserUpdateValidator, UserImportValidator
 
 users_router = Blueprint("users_router", __name__)
 
@@ -25,17 +59,56 @@ async def table():
     if message:
         return jsonify({"message": message})
 
-    users, err = await get_users_list()
+    args = request.args
+    try:
+        limit = int(args.get("limit", USERS_PAGE_SIZE))
+        role = Role(args["role"]) if args.get("role") else Role.USER
+        gender = Gender(args["gender"]) if args.get("gender") else None
+    except ValueError:
+        return jsonify({"error": "invalid filter parameters"})
+
+    filters = {
+        "role": role.value,
+        "gender": gender.value if gender else "",
+        "search": args.get("search", ""),
+        "order": "desc" if args.get("order") == "desc" else "asc",
+        "limit": limit,
+    }
+
+    changed_at, version = await get_users_version()
+    last_modified = http_last_modified(changed_at)
+    etag = make_etag(
+        changed_at,
+        version,
+        request.query_string,
+        current_user.id,
+        current_user.role.value,
+    )
+    if is_not_modified(etag, last_modified):
+        return not_modified(etag, last_modified)
+
+    page, err = await get_users_list(
+        after=args.get("after"),
+        before=args.get("before"),
+        limit=limit,
+        role=role,
+        gender=gender,
+        search=filters["search"],
+        descending=filters["order"] == "desc",
+    )
 
     context = {
         "title": "Users Table",
         "current_user": current_user,
-        "objects": users,
+        "objects": page.users if page else None,
+        "page": page,
+        "filters": filters,
         "error_message": err.capitalize() if err else None,
         "add_url": "users_router.add",
     }
 
-    return await render_template("users.html", **context)
+    response = await make_response(await render_template("users.html", **context))
+    return set_cache_headers(response, etag, last_modified)
 
 
 @users_router.route("/add_users", methods=["GET", "POST"])
@@ -68,6 +141,91 @@ async def add():
     return await render_template("add_user.html", **context)
 
 
+@users_router.route("/users/import", methods=["GET", "POST"])
+async def import_users():
+    auth_redirect, current_user = await auth_check()
+    if auth_redirect:
+        return auth_redirect
+
+    message = await role_check(
+        current_user.role, [Role.ADMIN], "only the admin has access"
+    )
+    if message:
+        return jsonify({"message": message})
+
+    context = {"title": "Import Users", "imported": None, "errors": []}
+
+    if request.method == "POST":
+        try:
+            files = await request.files
+        except RequestEntityTooLarge:
+            max_size = current_config().max_upload_size // (1024 * 1024)
+            context["error_message"] = f"The file is larger than {max_size} MB"
+            return await render_template("import_users.html", **context), 413
+
+        upload = files.get("file")
+        fmt = detect_format(upload.filename if upload else None)
+        if fmt is None:
+            context["error_message"] = "Upload a .csv or .jsonl file"
+            return await render_template("import_users.html", **context)
+
+        validator = UserImportValidator()
+        imported = 0
+        errors = []
+
+        for batch in batched(read_rows(upload.stream, fmt), IMPORT_BATCH_SIZE):
+            rows = []
+            for line, row in batch:
+                if row is None:
+                    errors.append((line, "Invalid JSON object"))
+                else:
+                    rows.append((line, row))
+
+            users, batch_errors = await validator.validate_batch(rows)
+            errors.extend(batch_errors)
+
+            count, err = await create_users([user for _, user in users])
+            imported += count
+            if err:
+                for line, user in users:
+                    count, err = await create_users([user])
+                    imported += count
+                    if err:
+                        errors.append((line, err))
+
+        context["imported"] = imported
+        context["errors"] = sorted(errors)
+
+    return await render_template("import_users.html", **context)
+
+
+@users_router.route("/users/export")
+async def export_users():
+    auth_redirect, current_user = await auth_check()
+    if auth_redirect:
+        return auth_redirect
+
+    message = await role_check(
+        current_user.role, [Role.ADMIN], "only the admin has access"
+    )
+    if message:
+        return jsonify({"message": message})
+
+    fmt = "jsonl" if request.args.get("format") == "jsonl" else "csv"
+
+    @stream_with_context
+    async def generate():
+        if fmt == "csv":
+            yield csv_header()
+        async for row in stream_users():
+            yield format_row(row, fmt)
+
+    mimetype = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    response = Response(generate(), mimetype=mimetype)
+    response.headers["Content-Disposition"] = f"attachment; filename=users.{fmt}"
+    return response
+
+
 @users_router.route("/user/details")
 async def details():
     user_id = int(request.args.get("id"))
@@ -81,6 +239,12 @@ async def details():
     if message:
         return jsonify({"message": message})
 
+    updated_at = await get_user_version(user_id)
+    last_modified = http_last_modified(updated_at)
+    etag = make_etag(user_id, updated_at, current_user.id, current_user.role.value)
+    if updated_at is not None and is_not_modified(etag, last_modified):
+        return not_modified(etag, last_modified)
+
     _, user, err = await get_user_by_id(user_id)
 
     if err:
@@ -93,7 +257,10 @@ async def details():
         "delete_url": "users_router.delete",
         "object": user,
     }
-    return await render_template("user_details.html", **context)
+    response = await make_response(
+        await render_template("user_details.html", **context)
+    )
+    return set_cache_headers(response, etag, last_modified)
 
 
 @users_router.route("/user/update", methods=["GET", "POST"])
@@ -0,0 +1,34 @@
+import asyncio
+from typing import Optional
+
+from quart import Quart
+
+from .config import Config, config as conf
+from .queries import refresh_recent_stats
+
+
+async def refresh_reports_forever(app: Quart, interval: float) -> None:
+    while True:
+        try:
+            await refresh_recent_stats()
+        except Exception:
+            app.logger.exception("report refresh failed")
+        await asyncio.sleep(interval)
+
+
+def schedule_report_refresh(app: Quart, config: Config = conf) -> None:
+    task: Optional[asyncio.Task] = None
+
+    @app.before_serving
+    async def start_report_refresh():
+        nonlocal task
+        if config.report_refresh_interval > 0:
+            task = asyncio.create_task(
+                refresh_reports_forever(app, config.report_refresh_interval)
+            )
+
+    @app.after_serving
+    async def stop_report_refresh():
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
@@ -0,0 +1,24 @@
+(function () {
+    var script = document.currentScript;
+    var source = new EventSource(script.dataset.stream);
+
+    function setStatus(id, status) {
+        var cell = document.getElementById("room-status-" + id);
+        if (!cell || cell.dataset.status === status) {
+            return;
+        }
+        cell.dataset.status = status;
+        cell.textContent = status.charAt(0).toUpperCase() + status.slice(1);
+    }
+
+    source.addEventListener("snapshot", function (event) {
+        JSON.parse(event.data).forEach(function (room) {
+            setStatus(room.id, room.status);
+        });
+    });
+
+    source.addEventListener("status", function (event) {
+        var room = JSON.parse(event.data);
+        setStatus(room.id, room.status);
+    });
+})();
@@ -0,0 +1,44 @@
+from typing import Callable
+
+from jinja2 import FileSystemBytecodeCache, nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+from quart import Quart
+
+from .cache import current_caches
+from .config import Config, config as conf
+
+
+class FragmentCacheExtension(Extension):
+    tags = {"cache"}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+
+        key = [parser.parse_expression()]
+        while parser.stream.skip_if("comma"):
+            key.append(parser.parse_expression())
+
+        body = parser.parse_statements(("name:endcache",), drop_needle=True)
+        return nodes.CallBlock(
+            self.call_method("_render", [nodes.Tuple(key, "load")]),
+            [],
+            [],
+            body,
+        ).set_lineno(lineno)
+
+    async def _render(self, key: tuple, caller: Callable) -> Markup:
+        html = current_caches().fragments.get(key)
+        if html is None:
+            html = Markup(await caller())
+            current_caches().fragments.set(key, html)
+        return html
+
+
+def configure_templates(app: Quart, config: Config = conf) -> None:
+    app.jinja_options = {
+        **app.jinja_options,
+        "bytecode_cache": FileSystemBytecodeCache(config.template_cache_dir),
+        "extensions": [FragmentCacheExtension],
+    }
+    app.config["TEMPLATES_AUTO_RELOAD"] = config.templates_auto_reload
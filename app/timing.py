@@ -0,0 +1,22 @@
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator
+
+from quart import g, has_request_context
+
+
+def add_timing(name: str, seconds: float, count: int = 1) -> None:
+    if not has_request_context():
+        return
+    timings = g.setdefault("timings", {})
+    total, calls = timings.get(name, (0.0, 0))
+    timings[name] = (total + seconds, calls + count)
+
+
+@asynccontextmanager
+async def timed(name: str) -> AsyncGenerator[None, None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_timing(name, time.perf_counter() - started)
@@ -1,58 +1,78 @@
 import re
+import asyncio
 from datetime import datetime
-from typing import Tuple, Optional, Dict
-from sqlalchemy import select, exists
+from typing import Tuple, Optional, Dict, List, Set
+from sqlalchemy import select, or_
 
 from ..database import get_session
+from ..hashing import current_hashing_pool
 from ..models import User, Role, Gender
 
+USERNAME_PATTERN = re.compile(r"^[A-Za-z0-9]+$")
+LETTERS_PATTERN = re.compile(r"[A-Za-z]")
+DIGITS_PATTERN = re.compile(r"[0-9]")
+RUSSIAN_PATTERN = re.compile(r"^[А-Яа-я]+$")
+PHONE_NUMBER_PATTERN = re.compile(r"^\+?[0-9]{10,15}$")
+ADDRESS_PATTERN = re.compile(r"^[A-Za-zА-Яа-я0-9 ,.-:]+$")
+
 
 class UserValidator:
     def __init__(self, form_data):
         self.form_data = form_data
 
     async def validate(self) -> Tuple[Optional[User], Optional[str]]:
+        fields_error = await self.fields_validate()
+        if fields_error:
+            return None, fields_error
+
+        unique_error = await self.unique_validate()
+        if unique_error:
+            return None, unique_error
+
+        return await self.create_user(), None
+
+    async def fields_validate(self) -> Optional[str]:
         username_error = await self.username_validate()
         if username_error:
-            return None, username_error
+            return username_error
 
         password_error = await self.password_validate()
         if password_error:
-            return None, password_error
+            return password_error
 
         name_error = await self.name_validate()
         if name_error:
-            return None, name_error
+            return name_error
 
         surname_error = await self.surname_validate()
         if surname_error:
-            return None, surname_error
+            return surname_error
 
         patronymic_error = await self.patronymic_validate()
         if patronymic_error:
-            return None, patronymic_error
+            return patronymic_error
 
         date_of_birth_error = await self.date_of_birth_validate()
         if date_of_birth_error:
-            return None, date_of_birth_error
+            return date_of_birth_error
 
         phone_number_error = await self.phone_number_validate()
         if phone_number_error:
-            return None, phone_number_error
+            return phone_number_error
 
         registration_address_error = await self.registration_address_validate()
         if registration_address_error:
-            return None, registration_address_error
+            return registration_address_error
 
         gender_error = await self.gender_validate()
         if gender_error:
-            return None, gender_error
+            return gender_error
 
         role_error = await self.role_validate()
         if role_error:
-            return None, role_error
+            return role_error
 
-        return await self.create_user(), None
+        return None
 
     async def create_user(self) -> User:
         user_data = {
@@ -74,15 +94,23 @@ class UserValidator:
 
         return user
 
+    async def unique_validate(self) -> Optional[str]:
+        taken_usernames, taken_phone_numbers = await find_existing_users(
+            {self.form_data["username"]}, {self.form_data["phone_number"]}
+        )
+        if taken_usernames:
+            return "User with this username is already there"
+        if taken_phone_numbers:
+            return "User with this phone number is already there"
+        return None
+
     async def username_validate(self) -> Optional[str]:
         username = self.form_data.get("username")
         if not username:
             return "Username is required"
-        if await exists_user_by_username(username):
-            return "User with this username is already there"
         if len(username) < 4 or len(username) > 20:
             return "Username must be between 4 and 20 characters"
-        if not re.match(r"^[A-Za-z0-9]+$", username):
+        if not USERNAME_PATTERN.match(username):
             return "Username must contain only letters and digits"
         return None
 
@@ -92,9 +120,7 @@ class UserValidator:
             return "Password is required"
         if len(password) < 8 or len(password) > 20:
             return "Password must be between 8 and 20 characters"
-        if not re.search(r"[A-Za-z]", password) or not re.search(
-            r"[0-9]", self.form_data["password"]
-        ):
+        if not LETTERS_PATTERN.search(password) or not DIGITS_PATTERN.search(password):
             return "Password must contain both letters and numbers"
         if password != self.form_data.get("confirm_password"):
             return "Passwords do not match"
@@ -104,7 +130,7 @@ class UserValidator:
         name = self.form_data.get("name")
         if not name:
             return "Name is required"
-        if not re.match(r"^[А-Яа-я]+$", name):
+        if not RUSSIAN_PATTERN.match(name):
             return "Name must contain only Russian letters"
         if len(name) < 2 or len(name) > 50:
             return "Name must be between 2 and 50 characters"
@@ -114,7 +140,7 @@ class UserValidator:
         surname = self.form_data.get("surname")
         if not surname:
             return "Surname is required"
-        if not re.match(r"^[А-Яа-я]+$", surname):
+        if not RUSSIAN_PATTERN.match(surname):
             return "Surname must contain only Russian letters"
         if len(surname) < 2 or len(surname) > 50:
             return "Surname must be between 2 and 50 characters"
@@ -122,7 +148,7 @@ class UserValidator:
 
     async def patronymic_validate(self) -> Optional[str]:
         patronymic = self.form_data.get("patronymic")
-        if patronymic and not re.match(r"^[А-Яа-я]+$", patronymic):
+        if patronymic and not RUSSIAN_PATTERN.match(patronymic):
             return "Patronymic must contain only Russian letters"
         if patronymic and (len(patronymic) < 2 or len(patronymic) > 50):
             return "Patronymic must be between 2 and 50 characters"
@@ -131,14 +157,20 @@ class UserValidator:
     async def date_of_birth_validate(self) -> Optional[str]:
         if not self.form_data.get("date_of_birth"):
             return "Date of birth is required"
+        try:
+            datetime.strptime(self.form_data["date_of_birth"], "%Y-%m-%d")
+        except ValueError:
+            return "Invalid date format. Use YYYY-MM-DD"
         return None
 
     async def phone_number_validate(self) -> Optional[str]:
         phone_number = self.form_data.get("phone_number")
         if not phone_number:
             return "Phone number is required"
-        if not re.match(r"^\+?[0-9]{10,15}$", phone_number):
+        if not PHONE_NUMBER_PATTERN.match(phone_number):
             return "Invalid phone number format"
+        if len(phone_number) > 12:
+            return "Phone number must be at most 12 characters"
         return None
 
     async def registration_address_validate(self) -> Optional[str]:
@@ -147,26 +179,112 @@ class UserValidator:
             return "Registration address is required"
         if len(registration_address) < 5 or len(registration_address) > 100:
             return "Registration address must be between 5 and 100 characters"
-        if not re.match(r"^[A-Za-zА-Яа-я0-9 ,.-:]+$", registration_address):
+        if not ADDRESS_PATTERN.match(registration_address):
             return "Registration address can only contain letters, numbers, and the following symbols: , . - :"
         return None
 
     async def gender_validate(self) -> Optional[str]:
-        if Gender(self.form_data.get("gender")) not in Gender:
+        try:
+            Gender(self.form_data.get("gender"))
+        except ValueError:
             return "Invalid gender"
         return None
 
     async def role_validate(self) -> Optional[str]:
-        if Role(self.form_data.get("role")) not in Role:
+        try:
+            Role(self.form_data.get("role"))
+        except ValueError:
             return "Invalid role"
         return None
 
 
+class UserImportValidator:
+    def __init__(self):
+        self.usernames: Set[str] = set()
+        self.phone_numbers: Set[str] = set()
+
+    async def create_user(self, validator: UserValidator) -> User:
+        async with current_hashing_pool().import_semaphore:
+            return await validator.create_user()
+
+    async def validate_batch(
+        self, rows: List[Tuple[int, Dict[str, str]]]
+    ) -> Tuple[List[Tuple[int, User]], List[Tuple[int, str]]]:
+        errors = []
+        validators = []
+
+        for line, row in rows:
+            row = dict(row)
+            row.setdefault("confirm_password", row.get("password"))
+
+            validator = UserValidator(row)
+            error = await validator.fields_validate()
+            if error is None and row["username"] in self.usernames:
+                error = "Username is duplicated in the file"
+            if error is None and row["phone_number"] in self.phone_numbers:
+                error = "Phone number is duplicated in the file"
+
+            if error:
+                errors.append((line, error))
+                continue
+
+            self.usernames.add(row["username"])
+            self.phone_numbers.add(row["phone_number"])
+            validators.append((line, validator))
+
+        taken_usernames, taken_phone_numbers = await find_existing_users(
+            {validator.form_data["username"] for _, validator in validators},
+            {validator.form_data["phone_number"] for _, validator in validators},
+        )
+
+        accepted = []
+        for line, validator in validators:
+            if validator.form_data["username"] in taken_usernames:
+                errors.append((line, "User with this username is already there"))
+            elif validator.form_data["phone_number"] in taken_phone_numbers:
+                errors.append((line, "User with this phone number is already there"))
+            else:
+                accepted.append((line, validator))
+
+        users = await asyncio.gather(
+            *(self.create_user(validator) for _, validator in accepted)
+        )
+        return [(line, user) for (line, _), user in zip(accepted, users)], errors
+
+
 class UserUpdateValidator:
     def __init__(self, form_data: Dict[str, str]):
         self.form_data = form_data
 
     async def validate(self, user: User) -> Optional[str]:
+        fields_error = await self.fields_validate(user)
+        if fields_error:
+            return fields_error
+
+        return await self.unique_validate(user)
+
+    async def unique_validate(self, user: User) -> Optional[str]:
+        usernames = set()
+        phone_numbers = set()
+
+        username = self.form_data.get("username")
+        if username and username != user.username:
+            usernames.add(username)
+
+        phone_number = self.form_data.get("phone_number")
+        if phone_number and phone_number != user.phone_number.strip():
+            phone_numbers.add(phone_number)
+
+        taken_usernames, taken_phone_numbers = await find_existing_users(
+            usernames, phone_numbers, exclude_user_id=user.id
+        )
+        if taken_usernames:
+            return "User with this username already exists"
+        if taken_phone_numbers:
+            return "User with this phone number already exists"
+        return None
+
+    async def fields_validate(self, user: User) -> Optional[str]:
         if "username" in self.form_data:
             username_error = await self.username_validate(user)
             if username_error:
@@ -223,11 +341,9 @@ class UserUpdateValidator:
         username = self.form_data.get("username")
         if username == user.username:
             return None
-        if await exists_user_by_username(username):
-            return "User with this username already exists"
         if len(username) < 4 or len(username) > 20:
             return "Username must be between 4 and 20 characters"
-        if not re.match(r"^[A-Za-z0-9]+$", username):
+        if not USERNAME_PATTERN.match(username):
             return "Username must contain only letters and digits"
         return None
 
@@ -235,13 +351,13 @@ class UserUpdateValidator:
         password = self.form_data.get("password")
         if len(password) < 8 or len(password) > 20:
             return "Password must be between 8 and 20 characters"
-        if not re.search(r"[A-Za-z]", password) or not re.search(r"[0-9]", password):
+        if not LETTERS_PATTERN.search(password) or not DIGITS_PATTERN.search(password):
             return "Password must contain both letters and numbers"
         return None
 
     async def name_validate(self) -> Optional[str]:
         name = self.form_data.get("name")
-        if not re.match(r"^[А-Яа-я]+$", name):
+        if not RUSSIAN_PATTERN.match(name):
             return "Name must contain only Russian letters"
         if len(name) < 2 or len(name) > 50:
             return "Name must be between 2 and 50 characters"
@@ -249,7 +365,7 @@ class UserUpdateValidator:
 
     async def surname_validate(self) -> Optional[str]:
         surname = self.form_data.get("surname")
-        if not re.match(r"^[А-Яа-я]+$", surname):
+        if not RUSSIAN_PATTERN.match(surname):
             return "Surname must contain only Russian letters"
         if len(surname) < 2 or len(surname) > 50:
             return "Surname must be between 2 and 50 characters"
@@ -257,7 +373,7 @@ class UserUpdateValidator:
 
     async def patronymic_validate(self) -> Optional[str]:
         patronymic = self.form_data.get("patronymic")
-        if patronymic and not re.match(r"^[А-Яа-я]+$", patronymic):
+        if patronymic and not RUSSIAN_PATTERN.match(patronymic):
             return "Patronymic must contain only Russian letters"
         if patronymic and (len(patronymic) < 2 or len(patronymic) > 50):
             return "Patronymic must be between 2 and 50 characters"
@@ -272,15 +388,17 @@ class UserUpdateValidator:
 
     async def phone_number_validate(self) -> Optional[str]:
         phone_number = self.form_data.get("phone_number")
-        if not re.match(r"^\+?[0-9]{10,15}$", phone_number):
+        if not PHONE_NUMBER_PATTERN.match(phone_number):
             return "Invalid phone number format"
+        if len(phone_number) > 12:
+            return "Phone number must be at most 12 characters"
         return None
 
     async def registration_address_validate(self) -> Optional[str]:
         registration_address = self.form_data.get("registration_address")
         if len(registration_address) < 5 or len(registration_address) > 100:
             return "Registration address must be between 5 and 100 characters"
-        if not re.match(r"^[A-Za-zА-Яа-я0-9 ,.-:]+$", registration_address):
+        if not ADDRESS_PATTERN.match(registration_address):
             return "Registration address can only contain letters, numbers, and the following symbols: , . - :"
         return None
 
@@ -299,8 +417,31 @@ class UserUpdateValidator:
         return None
 
 
-async def exists_user_by_username(username: str) -> bool:
+async def find_existing_users(
+    usernames: Set[str],
+    phone_numbers: Set[str],
+    exclude_user_id: Optional[int] = None,
+) -> Tuple[Set[str], Set[str]]:
+    if not usernames and not phone_numbers:
+        return set(), set()
+
+    query = select(User.username, User.phone_number).where(
+        or_(
+            User.username.in_(usernames),
+            User.phone_number.in_(phone_numbers),
+        )
+    )
+    if exclude_user_id is not None:
+        query = query.where(User.id != exclude_user_id)
+
     async with get_session() as session:
-        query = select(exists().where(User.username == username))
         result = await session.execute(query)
-        return result.scalar()
+        rows = result.all()
+
+    taken_usernames = {username for username, _ in rows if username in usernames}
+    taken_phone_numbers = {
+        phone_number.strip()
+        for _, phone_number in rows
+        if phone_number.strip() in phone_numbers
+    }
+    return taken_usernames, taken_phone_numbers
@@ -0,0 +1,202 @@
+import os
+import sys
+import time
+import asyncio
+import argparse
+import secrets
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from .load import Server, percentile, read_env_file, write_env_file
+from .postgres import DisposablePostgres
+from .seed import seed
+
+ALREADY_BOOKED = "room is already booked for these dates"
+
+FREE_ROOMS = """
+SELECT id FROM hotel_rooms AS room
+WHERE name LIKE 'Bench %' AND NOT EXISTS (
+    SELECT 1 FROM orders
+    WHERE orders.room = room.id
+      AND orders.arrival_date < :eviction AND orders.eviction_date > :arrival
+)
+ORDER BY id
+LIMIT :limit
+"""
+
+
+async def timed_booking(
+    client_id: int, room_id: int, arrival: datetime, eviction: datetime
+) -> Tuple[float, Optional[str]]:
+    from app.queries import create_order
+
+    started = time.perf_counter()
+    _, err = await create_order(client_id, room_id, arrival, eviction)
+    return time.perf_counter() - started, err
+
+
+async def same_room(
+    client_id: int, room_id: int, arrival: datetime, bookings: int
+) -> bool:
+    results = await asyncio.gather(
+        *(
+            timed_booking(
+                client_id,
+                room_id,
+                arrival + timedelta(days=index % 3),
+                arrival + timedelta(days=3 + index % 4),
+            )
+            for index in range(bookings)
+        )
+    )
+    errors = [err for _, err in results]
+    succeeded = errors.count(None)
+    rejected = errors.count(ALREADY_BOOKED)
+    latencies = [seconds for seconds, _ in results]
+
+    print(f"same room             {bookings} concurrent bookings")
+    print(f"  succeeded           {succeeded}")
+    print(f"  already booked      {rejected}")
+    print(f"  other errors        {sorted(set(errors) - {None, ALREADY_BOOKED})}")
+    print(
+        f"  p50 / p95           {percentile(latencies, 50) * 1000:.1f} / "
+        f"{percentile(latencies, 95) * 1000:.1f} ms"
+    )
+    return succeeded == 1 and rejected == bookings - 1
+
+
+async def other_rooms(
+    client_id: int, locked_room: int, room_ids: List[int], arrival: datetime
+) -> bool:
+    from sqlalchemy import text
+
+    from app.database import database
+
+    eviction = arrival + timedelta(days=2)
+    async with database.engine.connect() as connection:
+        await connection.execute(
+            text("SELECT id FROM hotel_rooms WHERE id = :id FOR UPDATE"),
+            {"id": locked_room},
+        )
+
+        blocked = asyncio.create_task(
+            timed_booking(client_id, locked_room, arrival, eviction)
+        )
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            *(
+                timed_booking(client_id, room_id, arrival, eviction)
+                for room_id in room_ids
+            )
+        )
+        parallel = time.perf_counter() - started
+        waiting = not blocked.done()
+
+        await connection.rollback()
+
+    released, blocked_err = await blocked
+    errors = [err for _, err in results]
+    serial = sum(seconds for seconds, _ in results)
+
+    print(
+        f"other rooms           {len(room_ids)} bookings while room "
+        f"{locked_room} is locked"
+    )
+    print(f"  succeeded           {errors.count(None)}")
+    print(f"  wall / sum          {parallel * 1000:.1f} / {serial * 1000:.1f} ms")
+    print(
+        f"  locked room waited  {waiting} ({released * 1000:.1f} ms, "
+        f"{blocked_err or 'booked'})"
+    )
+    return errors.count(None) == len(room_ids) and waiting and blocked_err is None
+
+
+async def stress(args: argparse.Namespace, user_ids: List[int]) -> int:
+    from sqlalchemy import text
+
+    from app.database import database
+
+    arrival = datetime.now().replace(microsecond=0) + timedelta(days=args.days_ahead)
+    async with database.session() as session:
+        rooms = (
+            await session.scalars(
+                text(FREE_ROOMS),
+                {
+                    "arrival": arrival,
+                    "eviction": arrival + timedelta(days=7),
+                    "limit": args.rooms_parallel + 2,
+                },
+            )
+        ).all()
+    if len(rooms) < args.rooms_parallel + 2:
+        print("not enough free rooms for the chosen dates")
+        return 1
+
+    try:
+        ok = await same_room(user_ids[0], rooms[0], arrival, args.bookings)
+        ok = await other_rooms(user_ids[0], rooms[1], rooms[2:], arrival) and ok
+    finally:
+        async with database.session() as session:
+            await session.execute(
+                text(
+                    "DELETE FROM orders WHERE room = ANY(:rooms) "
+                    "AND arrival_date >= :arrival"
+                ),
+                {"rooms": list(rooms), "arrival": arrival},
+            )
+            await session.commit()
+        await database.dispose()
+
+    return 0 if ok else 1
+
+
+async def benchmark(args: argparse.Namespace, env: Dict[str, str]) -> int:
+    env = {"SECRET_KEY": secrets.token_hex(32), "TOKEN_LIFETIME": "3600", **env}
+    env_file = write_env_file(env)
+    try:
+        Server(env_file, 1).migrate()
+        ids = await seed(env, args.users, args.rooms, args.orders)
+        os.environ["ENV_FILE"] = env_file
+        return await stress(args, ids["users"])
+    finally:
+        os.unlink(env_file)
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Стресс-тест бронирования: параллельные заказы одного номера "
+        "на пересекающиеся даты, код возврата 1, если успешен не ровно один"
+    )
+    parser.add_argument("--bookings", type=int, default=50)
+    parser.add_argument(
+        "--rooms-parallel",
+        type=int,
+        default=10,
+        help="Сколько других номеров бронировать, пока один номер заблокирован",
+    )
+    parser.add_argument("--days-ahead", type=int, default=1000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--rooms", type=int, default=100)
+    parser.add_argument("--orders", type=int, default=1000)
+    parser.add_argument("--pg-bin", help="Каталог с бинарниками PostgreSQL")
+    parser.add_argument(
+        "--env-file",
+        help="Использовать существующую БД из .env вместо временной "
+        "(в неё будут добавлены тестовые данные)",
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_arguments()
+
+    if args.env_file:
+        env = read_env_file(args.env_file)
+        return asyncio.run(benchmark(args, env))
+
+    with DisposablePostgres(args.pg_bin) as postgres:
+        return asyncio.run(benchmark(args, postgres.env))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+import asyncio
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+import h11
+
+
+class HTTPClient:
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.cookies: Dict[str, str] = {}
+
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._connection: Optional[h11.Connection] = None
+
+    async def _connect(self) -> None:
+        await self.close()
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        self._connection = h11.Connection(h11.CLIENT)
+
+    async def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except ConnectionError:
+                pass
+        self._reader = self._writer = self._connection = None
+
+    async def get(self, path: str, headers: Optional[List[Tuple[str, str]]] = None):
+        return await self.request("GET", path, headers=headers)
+
+    async def post(self, path: str, form: Dict[str, str]):
+        body = urlencode(form).encode("utf-8")
+        headers = [("Content-Type", "application/x-www-form-urlencoded")]
+        return await self.request("POST", path, headers=headers, body=body)
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        headers: Optional[List[Tuple[str, str]]] = None,
+        body: bytes = b"",
+    ) -> Tuple[int, Dict[str, str], bytes]:
+        if self._connection is None or self._connection.our_state is not h11.IDLE:
+            await self._connect()
+
+        request_headers = [
+            ("Host", f"{self.host}:{self.port}"),
+            ("Content-Length", str(len(body))),
+        ]
+        if self.cookies:
+            cookie = "; ".join(f"{key}={value}" for key, value in self.cookies.items())
+            request_headers.append(("Cookie", cookie))
+        request_headers.extend(headers or [])
+
+        connection = self._connection
+        data = connection.send(
+            h11.Request(method=method, target=path, headers=request_headers)
+        )
+        if body:
+            data += connection.send(h11.Data(data=body))
+        data += connection.send(h11.EndOfMessage())
+        self._writer.write(data)
+        await self._writer.drain()
+
+        status = 0
+        response_headers: Dict[str, str] = {}
+        chunks = []
+        while True:
+            event = connection.next_event()
+            if event is h11.NEED_DATA:
+                data = await self._reader.read(65536)
+                connection.receive_data(data)
+                continue
+            if isinstance(event, h11.Response):
+                status = event.status_code
+                for name, value in event.headers:
+                    name = name.decode("latin-1").lower()
+                    value = value.decode("latin-1")
+                    if name == "set-cookie":
+                        self._store_cookie(value)
+                    response_headers[name] = value
+            elif isinstance(event, h11.Data):
+                chunks.append(bytes(event.data))
+            elif isinstance(event, (h11.EndOfMessage, h11.ConnectionClosed)):
+                break
+
+        if connection.our_state is h11.DONE and connection.their_state is h11.DONE:
+            connection.start_next_cycle()
+        else:
+            await self.close()
+
+        return status, response_headers, b"".join(chunks)
+
+    def _store_cookie(self, header: str) -> None:
+        name, _, rest = header.partition("=")
+        value = rest.split(";", 1)[0]
+        if value:
+            self.cookies[name.strip()] = value
+        else:
+            self.cookies.pop(name.strip(), None)
@@ -0,0 +1,215 @@
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+from typing import Callable, Dict, List
+
+from app.config import config as conf
+from app.middleware.compression import (
+    CHUNK_SIZE,
+    ENCODINGS,
+    BrotliCompressor,
+    Compressor,
+    GzipCompressor,
+    compress_data,
+)
+
+SIZES = (1024, 8 * 1024, 64 * 1024, 512 * 1024, 4 * 1024 * 1024)
+GENDERS = ("Male", "Female")
+ROLES = ("User", "Admin")
+
+
+def users_html(size: int, rng: random.Random) -> bytes:
+    rows = []
+    length = 0
+    while length < size:
+        index = rng.randint(1, 10**7)
+        row = (
+            f"<tr><td>bench{index:07d}</td>"
+            f"<td>Петров{index} {rng.choice('АБВГДИМС')}.{rng.choice('АБВГДИМС')}.</td>"
+            f"<td>{rng.choice(GENDERS)}</td><td>{rng.choice(ROLES)}</td>"
+            f'<td><a href="/user/details?id={index}">Details</a></td></tr>\n'
+        )
+        rows.append(row)
+        length += len(row.encode())
+    return ("<table>\n" + "".join(rows) + "</table>").encode()[:size]
+
+
+def rooms_json(size: int, rng: random.Random) -> bytes:
+    rooms = []
+    length = 0
+    while length < size:
+        index = rng.randint(1, 10**5)
+        room = {
+            "id": index,
+            "name": f"Room {index}",
+            "floor": rng.randint(1, 12),
+            "price": rng.randint(10, 200) * 100.0,
+            "status": rng.choice(("free", "busy", "cleaning")),
+            "equipment": rng.sample(("Минибар", "Сейф", "Телевизор", "Кондиционер"), 2),
+        }
+        rooms.append(room)
+        length += len(json.dumps(room, ensure_ascii=False).encode()) + 1
+    return json.dumps(rooms, ensure_ascii=False).encode()
+
+
+BODIES: Dict[str, Callable[[int, random.Random], bytes]] = {
+    "html": users_html,
+    "json": rooms_json,
+}
+
+
+def codecs(
+    levels: List[int], qualities: List[int]
+) -> Dict[str, Callable[[], Compressor]]:
+    result = {
+        f"gzip-{level}": (lambda level=level: GzipCompressor(level)) for level in levels
+    }
+    if "br" in ENCODINGS:
+        for quality in qualities:
+            result[f"br-{quality}"] = lambda quality=quality: BrotliCompressor(quality)
+    return result
+
+
+def compress_chunked(data: bytes, compressor: Compressor) -> int:
+    wire = 0
+    for start in range(0, len(data), CHUNK_SIZE):
+        wire += len(compressor.compress(data[start : start + CHUNK_SIZE]))
+    return wire + len(compressor.flush())
+
+
+def measure(
+    data: bytes, factory: Callable[[], Compressor], streamed: bool, budget: float
+) -> Dict[str, float]:
+    runs = 0
+    wire = 0
+    started = time.process_time()
+    while runs == 0 or time.process_time() - started < budget:
+        compressor = factory()
+        if streamed:
+            wire = compress_chunked(data, compressor)
+        else:
+            wire = len(compress_data(data, compressor))
+        runs += 1
+    cpu = (time.process_time() - started) / runs
+    return {
+        "bytes": len(data),
+        "wire": wire,
+        "ratio": round(len(data) / wire, 2),
+        "cpu_ms": round(cpu * 1000, 3),
+        "mb_s": round(len(data) / cpu / 1e6, 1) if cpu else 0.0,
+    }
+
+
+def compare(
+    results: Dict[str, Dict[str, float]], baseline_path: str, tolerance: float
+) -> List[str]:
+    with open(baseline_path, encoding="utf-8") as file:
+        baseline = json.load(file)["results"]
+
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if not previous:
+            continue
+        if current["cpu_ms"] > previous["cpu_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{key}: cpu {previous['cpu_ms']}ms -> {current['cpu_ms']}ms"
+            )
+        if current["wire"] > previous["wire"] * (1 + tolerance):
+            regressions.append(f"{key}: wire {previous['wire']} -> {current['wire']}")
+    return regressions
+
+
+def print_report(results: Dict[str, Dict[str, float]]) -> None:
+    print(
+        f"{'body':<6}{'size':>10}{'codec':>10}{'mode':>8}{'wire':>10}"
+        f"{'ratio':>8}{'cpu ms':>10}{'MB/s':>8}"
+    )
+    for key, stats in results.items():
+        body, size, codec, mode = key.split(":")
+        print(
+            f"{body:<6}{size:>10}{codec:>10}{mode:>8}{stats['wire']:>10}"
+            f"{stats['ratio']:>8}{stats['cpu_ms']:>10}{stats['mb_s']:>8}"
+        )
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Сжатие ответов: байты на проводе и CPU на ответ по размерам"
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--bodies", nargs="+", choices=BODIES, default=list(BODIES))
+    parser.add_argument(
+        "--gzip-levels",
+        type=int,
+        nargs="+",
+        default=sorted({1, conf.compress_gzip_level, 9}),
+    )
+    parser.add_argument(
+        "--brotli-qualities",
+        type=int,
+        nargs="+",
+        default=sorted({1, conf.compress_brotli_quality, 11}),
+    )
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=0.2,
+        help="Секунд CPU на одно измерение",
+    )
+    parser.add_argument("--output", help="Сохранить результаты в JSON")
+    parser.add_argument("--compare", help="Сравнить с сохранённым JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_arguments()
+    rng = random.Random(0)
+
+    results = {}
+    for body in args.bodies:
+        for size in args.sizes:
+            data = BODIES[body](size, rng)
+            for codec, factory in codecs(
+                args.gzip_levels, args.brotli_qualities
+            ).items():
+                modes = ["whole"]
+                if size >= conf.compress_stream_size:
+                    modes.append("stream")
+                for mode in modes:
+                    results[f"{body}:{size}:{codec}:{mode}"] = measure(
+                        data, factory, mode == "stream", args.budget
+                    )
+
+    print_report(results)
+    if "br" not in ENCODINGS:
+        print("\nbrotli не установлен, измерен только gzip")
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "chunk_size": CHUNK_SIZE,
+            "min_size": conf.compress_min_size,
+            "stream_size": conf.compress_stream_size,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,267 @@
+import os
+import sys
+import asyncio
+import argparse
+import secrets
+from datetime import date, datetime, timedelta
+from typing import Awaitable, Callable, Dict, Iterator, List, Set
+
+from .load import Server, read_env_file, write_env_file
+from .postgres import DisposablePostgres
+from .seed import seed
+
+FULL_SCANS: Dict[str, Set[str]] = {
+    "users_export": {"users"},
+    "room_statuses": {"hotel_rooms"},
+    "available_rooms": {"hotel_rooms"},
+    "report_refresh": {"report_dirty_days"},
+}
+
+
+def full_scans(plan: dict) -> Iterator[str]:
+    node_type = plan.get("Node Type")
+    if node_type == "Seq Scan":
+        yield plan["Relation Name"]
+    if node_type in ("Index Scan", "Index Only Scan") and "Index Cond" not in plan:
+        yield plan["Relation Name"]
+    for child in plan.get("Plans", ()):
+        yield from full_scans(child)
+
+
+def index_lookups(plan: dict) -> Iterator[str]:
+    node_type = plan.get("Node Type")
+    if node_type in ("Index Scan", "Index Only Scan") and "Index Cond" in plan:
+        yield plan["Relation Name"]
+    if node_type == "Bitmap Heap Scan":
+        yield plan["Relation Name"]
+    for child in plan.get("Plans", ()):
+        yield from index_lookups(child)
+
+
+async def explain(connection, statement: str, parameters) -> dict:
+    result = await connection.exec_driver_sql(
+        "EXPLAIN (FORMAT JSON) " + statement, parameters
+    )
+    return result.scalar()[0]["Plan"]
+
+
+def query_cases(ids: Dict[str, List[int]]) -> Dict[str, Callable[[], Awaitable]]:
+    from sqlalchemy import delete
+    from sqlalchemy.dialects.postgresql import insert
+
+    from app.database import get_session
+    from app.models import Gender, Order, ReportDirtyDay, Role
+    from app.queries import (
+        create_order,
+        get_available_rooms,
+        get_occupancy_report,
+        get_room_statuses,
+        get_rooms_catalogue,
+        get_user_by_id,
+        get_user_by_username,
+        get_user_token,
+        get_user_version,
+        get_users_list,
+        get_users_version,
+        refresh_recent_stats,
+        stream_users,
+    )
+    from app.validators.user import find_existing_users
+
+    user_id = ids["users"][0]
+    arrival = datetime.now() + timedelta(days=30)
+    today = date.today()
+
+    async def users_next_page():
+        page, _ = await get_users_list()
+        await get_users_list(after=page.next_cursor)
+
+    async def users_export():
+        async for _ in stream_users():
+            pass
+
+    async def booking():
+        booked_from = datetime.now().replace(microsecond=0) + timedelta(days=5000)
+        order, err = await create_order(
+            user_id, ids["rooms"][0], booked_from, booked_from + timedelta(days=2)
+        )
+        if err:
+            raise RuntimeError(err)
+        async with get_session() as session:
+            await session.execute(delete(Order).where(Order.id == order.id))
+            await session.commit()
+
+    async def report_refresh():
+        async with get_session() as session:
+            await session.execute(
+                insert(ReportDirtyDay)
+                .values(
+                    [{"day": today + timedelta(days=offset)} for offset in range(-2, 3)]
+                )
+                .on_conflict_do_nothing()
+            )
+            await session.commit()
+        await refresh_recent_stats()
+
+    return {
+        "users_list": lambda: get_users_list(),
+        "users_list_desc": lambda: get_users_list(descending=True),
+        "users_list_next_page": users_next_page,
+        "users_list_search": lambda: get_users_list(search="bench00012"),
+        "users_list_filtered": lambda: get_users_list(
+            role=Role.CLIENT, gender=Gender.MALE
+        ),
+        "users_version": get_users_version,
+        "user_version": lambda: get_user_version(user_id),
+        "user_by_id": lambda: get_user_by_id(user_id),
+        "user_by_username": lambda: get_user_by_username("bench0000001"),
+        "user_token": lambda: get_user_token(user_id),
+        "find_existing_users": lambda: find_existing_users(
+            {"bench0000001", "bench0000002"}, {"+78000000003"}
+        ),
+        "available_rooms": lambda: get_available_rooms(
+            arrival, arrival + timedelta(days=3)
+        ),
+        "rooms_catalogue_equipment": lambda: get_rooms_catalogue(
+            equipment=ids["equipment"][:2]
+        ),
+        "room_statuses": get_room_statuses,
+        "occupancy_report": lambda: get_occupancy_report(
+            today - timedelta(days=30), today
+        ),
+        "occupancy_report_floor": lambda: get_occupancy_report(
+            today - timedelta(days=30), today, group="floor"
+        ),
+        "users_export": users_export,
+        "create_order": booking,
+        "report_refresh": report_refresh,
+    }
+
+
+async def explain_queries(ids: Dict[str, List[int]], min_rows: int) -> int:
+    from sqlalchemy import event, text
+
+    from app.database import database
+    from app.queries import refresh_room_daily_stats
+
+    today = date.today()
+    await refresh_room_daily_stats(today - timedelta(days=365), today)
+
+    engine = database.engine
+
+    async with engine.connect() as connection:
+        connection = await connection.execution_options(isolation_level="AUTOCOMMIT")
+        await connection.exec_driver_sql("VACUUM ANALYZE")
+        result = await connection.execute(
+            text(
+                "SELECT relname, reltuples FROM pg_class "
+                "WHERE relkind = 'r' AND relnamespace = 'public'::regnamespace"
+            )
+        )
+        large_tables = {name for name, rows in result if rows >= min_rows}
+
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    failures = 0
+    for name, run in query_cases(ids).items():
+        captured.clear()
+        event.listen(engine.sync_engine, "before_cursor_execute", capture)
+        try:
+            await run()
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+        scans, preferred = set(), set()
+        async with engine.connect() as connection:
+            for statement, parameters in captured:
+                if statement.startswith("EXPLAIN"):
+                    continue
+                plan = await explain(connection, statement, parameters)
+                tables = set(full_scans(plan)) & large_tables
+                if not tables:
+                    continue
+
+                await connection.exec_driver_sql("SET enable_seqscan = off")
+                forced = await explain(connection, statement, parameters)
+                await connection.exec_driver_sql("RESET enable_seqscan")
+                indexed = set(index_lookups(forced)) - set(full_scans(forced))
+                preferred.update(tables & indexed)
+                scans.update(tables - indexed)
+
+        allowed = scans & FULL_SCANS.get(name, set())
+        scans -= allowed
+        notes = [f"{len(captured)} queries"]
+        if allowed:
+            notes.append(f"full scan allowed on {', '.join(sorted(allowed))}")
+        if preferred:
+            notes.append(f"full scan preferred on {', '.join(sorted(preferred))}")
+        if scans:
+            failures += 1
+            print(f"{name:<28}FULL SCAN on {', '.join(sorted(scans))}")
+        else:
+            print(f"{name:<28}ok ({', '.join(notes)})")
+
+    await engine.dispose()
+    return 1 if failures else 0
+
+
+async def check(args: argparse.Namespace, env: Dict[str, str]) -> int:
+    env = {
+        "SECRET_KEY": secrets.token_hex(32),
+        "TOKEN_LIFETIME": "3600",
+        **env,
+        "COUNT_ESTIMATE_THRESHOLD": str(args.min_rows),
+    }
+    env_file = write_env_file(env)
+    try:
+        Server(env_file, 1).migrate()
+        ids = await seed(env, args.users, args.rooms, args.orders)
+        os.environ["ENV_FILE"] = env_file
+        return await explain_queries(ids, args.min_rows)
+    finally:
+        os.unlink(env_file)
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Проверка планов запросов: код возврата 1 при полном "
+        "просмотре больших таблиц без подходящего индекса"
+    )
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--rooms", type=int, default=400)
+    parser.add_argument("--orders", type=int, default=100000)
+    parser.add_argument(
+        "--min-rows",
+        type=int,
+        default=1000,
+        help="Полный просмотр (Seq Scan или Index Scan без Index Cond) таблиц "
+        "меньше этого размера не считается регрессией; для больших таблиц он "
+        "допустим, только если при enable_seqscan=off запрос идёт по индексу "
+        "с условием "
+        "(полный просмотр разрешён явно только запросам из FULL_SCANS)",
+    )
+    parser.add_argument("--pg-bin", help="Каталог с бинарниками PostgreSQL")
+    parser.add_argument(
+        "--env-file",
+        help="Использовать существующую БД из .env вместо временной "
+        "(в неё будут добавлены тестовые данные)",
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_arguments()
+
+    if args.env_file:
+        env = read_env_file(args.env_file)
+        return asyncio.run(check(args, env))
+
+    with DisposablePostgres(args.pg_bin) as postgres:
+        return asyncio.run(check(args, postgres.env))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,364 @@
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import platform
+import secrets
+import subprocess
+import tempfile
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from .client import HTTPClient
+from .postgres import DisposablePostgres, free_port
+from .seed import BENCH_ADMIN, BENCH_PASSWORD, seed
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ROUTES = ("/login", "/", "/users", "/user/details", "/user/update", "/add_users")
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, round(q / 100 * len(values)) - 1))
+    return values[index]
+
+
+def read_env_file(path: str) -> Dict[str, str]:
+    env = {}
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            line = line.strip()
+            if not line or line.startswith("#") or "=" not in line:
+                continue
+            key, _, value = line.partition("=")
+            env[key.strip()] = value.strip().strip("\"'")
+    return env
+
+
+def write_env_file(env: Dict[str, str]) -> str:
+    fd, path = tempfile.mkstemp(prefix="hotel-bench-", suffix=".env")
+    with os.fdopen(fd, "w", encoding="utf-8") as file:
+        for key, value in env.items():
+            file.write(f'{key}="{value}"\n')
+    return path
+
+
+class Server:
+    def __init__(self, env_file: str, workers: int):
+        self.env_file = env_file
+        self.workers = workers
+        self.port = free_port()
+        self.process: Optional[subprocess.Popen] = None
+
+    def _env(self) -> Dict[str, str]:
+        env = dict(os.environ)
+        env["ENV_FILE"] = self.env_file
+        return env
+
+    def migrate(self) -> None:
+        subprocess.run(
+            [sys.executable, "-m", "alembic", "upgrade", "head"],
+            cwd=ROOT,
+            env=self._env(),
+            check=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+    async def start(self, timeout: float = 30) -> None:
+        self.process = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "hypercorn",
+                "app.main:create_app()",
+                "--bind",
+                f"127.0.0.1:{self.port}",
+                "--workers",
+                str(self.workers),
+            ],
+            cwd=ROOT,
+            env=self._env(),
+            stdout=subprocess.DEVNULL,
+        )
+
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError("hypercorn exited during startup")
+            try:
+                _, writer = await asyncio.open_connection("127.0.0.1", self.port)
+                writer.close()
+                return
+            except OSError:
+                await asyncio.sleep(0.2)
+        raise RuntimeError("hypercorn did not start in time")
+
+    def stop(self) -> None:
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+
+class Scenario:
+    def __init__(self, port: int, user_ids: List[int]):
+        self.port = port
+        self.user_ids = user_ids
+        self.counter = 0
+
+    async def client(self) -> HTTPClient:
+        client = HTTPClient("127.0.0.1", self.port)
+        await self.login(client)
+        return client
+
+    async def login(self, client: HTTPClient) -> int:
+        status, _, _ = await client.post(
+            "/login", {"username": BENCH_ADMIN, "password": BENCH_PASSWORD}
+        )
+        return status
+
+    async def index(self, client: HTTPClient) -> int:
+        status, _, _ = await client.get("/")
+        return status
+
+    async def users(self, client: HTTPClient) -> int:
+        status, _, _ = await client.get("/users")
+        return status
+
+    async def details(self, client: HTTPClient) -> int:
+        user_id = random.choice(self.user_ids)
+        status, _, _ = await client.get(f"/user/details?id={user_id}")
+        return status
+
+    async def update(self, client: HTTPClient) -> int:
+        user_id = self.user_ids[0]
+        status, _, _ = await client.post(
+            f"/user/update?id={user_id}",
+            {
+                "username": "bench0000001",
+                "surname": "Петров",
+                "name": "Иван",
+                "patronymic": "Сергеевич",
+                "date_of_birth": "1990-01-01",
+                "phone_number": "+78000000001",
+                "registration_address": "Москва, ул. Ленина 1",
+                "gender": "female",
+                "role": "user",
+            },
+        )
+        return status
+
+    async def add_user(self, client: HTTPClient) -> int:
+        self.counter += 1
+        suffix = f"{os.getpid() % 1000:03d}{self.counter:06d}"
+        status, _, _ = await client.post(
+            "/add_users",
+            {
+                "username": f"benchnew{suffix}",
+                "password": "Bench12345",
+                "confirm_password": "Bench12345",
+                "name": "Анна",
+                "surname": "Смирнова",
+                "patronymic": "Олеговна",
+                "date_of_birth": "1995-05-05",
+                "phone_number": f"+76{suffix}",
+                "registration_address": "Москва, ул. Ленина 2",
+                "gender": "female",
+                "role": "user",
+            },
+        )
+        return status
+
+    def actions(self) -> Dict[str, Callable[[HTTPClient], Awaitable[int]]]:
+        return {
+            "/login": self.login,
+            "/": self.index,
+            "/users": self.users,
+            "/user/details": self.details,
+            "/user/update": self.update,
+            "/add_users": self.add_user,
+        }
+
+
+async def run_route(
+    scenario: Scenario,
+    action: Callable[[HTTPClient], Awaitable[int]],
+    concurrency: int,
+    duration: float,
+) -> Dict[str, float]:
+    clients = [await scenario.client() for _ in range(concurrency)]
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.monotonic() + duration
+
+    async def worker(client: HTTPClient) -> None:
+        nonlocal errors
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            try:
+                status = await action(client)
+            except (OSError, ValueError):
+                status = 0
+            latencies.append(time.perf_counter() - started)
+            if status >= 400 or status == 0:
+                errors += 1
+
+    started = time.monotonic()
+    await asyncio.gather(*(worker(client) for client in clients))
+    elapsed = time.monotonic() - started
+
+    for client in clients:
+        await client.close()
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def compare(
+    results: Dict[str, Dict[str, float]], baseline_path: str, tolerance: float
+) -> List[str]:
+    with open(baseline_path, encoding="utf-8") as file:
+        baseline = json.load(file)["routes"]
+
+    regressions = []
+    for route, current in results.items():
+        previous = baseline.get(route)
+        if not previous:
+            continue
+        if current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{route}: p95 {previous['p95_ms']}ms -> {current['p95_ms']}ms"
+            )
+        if current["rps"] < previous["rps"] * (1 - tolerance):
+            regressions.append(
+                f"{route}: throughput {previous['rps']} -> {current['rps']} req/s"
+            )
+    return regressions
+
+
+def print_report(results: Dict[str, Dict[str, float]]) -> None:
+    print(
+        f"{'route':<16}{'requests':>10}{'errors':>8}{'req/s':>10}"
+        f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    )
+    for route, stats in results.items():
+        print(
+            f"{route:<16}{stats['requests']:>10}{stats['errors']:>8}"
+            f"{stats['rps']:>10}{stats['p50_ms']:>10}{stats['p95_ms']:>10}"
+            f"{stats['p99_ms']:>10}"
+        )
+
+
+async def benchmark(args: argparse.Namespace, env: Dict[str, str]) -> int:
+    env = {
+        "SECRET_KEY": secrets.token_hex(32),
+        "TOKEN_LIFETIME": "3600",
+        **env,
+        **dict(item.split("=", 1) for item in args.set),
+    }
+    env_file = write_env_file(env)
+    server = Server(env_file, args.workers)
+    try:
+        server.migrate()
+        ids = await seed(env, args.users, args.rooms, args.orders)
+        await server.start()
+
+        scenario = Scenario(server.port, ids["users"])
+        actions = scenario.actions()
+        results = {}
+        for route in args.routes:
+            results[route] = await run_route(
+                scenario, actions[route], args.concurrency, args.duration
+            )
+    finally:
+        server.stop()
+        os.unlink(env_file)
+
+    print_report(results)
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "workers": args.workers,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "users": args.users,
+            "rooms": args.rooms,
+            "orders": args.orders,
+            "settings": args.set,
+        },
+        "routes": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+
+    return 0
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Нагрузочное тестирование приложения под Hypercorn"
+    )
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--rooms", type=int, default=400)
+    parser.add_argument("--orders", type=int, default=100000)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument(
+        "--routes", nargs="+", choices=ROUTES, default=list(ROUTES), metavar="ROUTE"
+    )
+    parser.add_argument(
+        "--set",
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="Дополнительная переменная окружения приложения",
+    )
+    parser.add_argument("--pg-bin", help="Каталог с бинарниками PostgreSQL")
+    parser.add_argument(
+        "--env-file",
+        help="Использовать существующую БД из .env вместо временной "
+        "(в неё будут добавлены тестовые данные)",
+    )
+    parser.add_argument("--output", help="Сохранить результаты в JSON")
+    parser.add_argument("--compare", help="Сравнить с сохранённым JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_arguments()
+
+    if args.env_file:
+        env = read_env_file(args.env_file)
+        return asyncio.run(benchmark(args, env))
+
+    with DisposablePostgres(args.pg_bin) as postgres:
+        return asyncio.run(benchmark(args, postgres.env))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
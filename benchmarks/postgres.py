@@ -0,0 +1,103 @@
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+from typing import Dict, Optional
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def find_bin_dir(bin_dir: Optional[str] = None) -> str:
+    bin_dir = bin_dir or os.getenv("PG_BIN")
+    if bin_dir:
+        return bin_dir
+
+    initdb = shutil.which("initdb")
+    if initdb:
+        return os.path.dirname(initdb)
+
+    pg_config = shutil.which("pg_config")
+    if pg_config:
+        return subprocess.check_output([pg_config, "--bindir"], text=True).strip()
+
+    raise RuntimeError("PostgreSQL binaries not found, pass --pg-bin or set PG_BIN")
+
+
+class DisposablePostgres:
+    def __init__(self, bin_dir: Optional[str] = None, db_name: str = "bench"):
+        self.bin_dir = find_bin_dir(bin_dir)
+        self.db_name = db_name
+        self.port = free_port()
+        self.root: Optional[str] = None
+
+    def _run(self, name: str, *args: str) -> None:
+        subprocess.run(
+            [os.path.join(self.bin_dir, name), *args],
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+
+    @property
+    def data_dir(self) -> str:
+        return os.path.join(self.root, "data")
+
+    @property
+    def env(self) -> Dict[str, str]:
+        return {
+            "HOST": "127.0.0.1",
+            "PORT": str(self.port),
+            "DBNAME": self.db_name,
+            "USER": "postgres",
+            "PASSWORD": "",
+        }
+
+    def start(self) -> "DisposablePostgres":
+        self.root = tempfile.mkdtemp(prefix="hotel-bench-")
+        self._run("initdb", "-D", self.data_dir, "-U", "postgres", "-A", "trust")
+
+        options = (
+            f"-p {self.port} -h 127.0.0.1 -k {self.root} "
+            "-c fsync=off -c synchronous_commit=off -c full_page_writes=off"
+        )
+        self._run(
+            "pg_ctl",
+            "-D",
+            self.data_dir,
+            "-o",
+            options,
+            "-l",
+            os.path.join(self.root, "postgres.log"),
+            "-w",
+            "start",
+        )
+        self._run(
+            "createdb",
+            "-h",
+            "127.0.0.1",
+            "-p",
+            str(self.port),
+            "-U",
+            "postgres",
+            self.db_name,
+        )
+        return self
+
+    def stop(self) -> None:
+        if self.root is None:
+            return
+        try:
+            self._run("pg_ctl", "-D", self.data_dir, "-m", "immediate", "stop")
+        finally:
+            shutil.rmtree(self.root, ignore_errors=True)
+            self.root = None
+
+    def __enter__(self) -> "DisposablePostgres":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
@@ -0,0 +1,142 @@
+from typing import Dict, List
+
+import asyncpg
+import bcrypt
+
+BENCH_ADMIN = "benchadmin"
+BENCH_PASSWORD = "Bench12345"
+
+CLEANUP = (
+    "DELETE FROM orders WHERE client_id IN "
+    "(SELECT id FROM users WHERE username LIKE 'bench%')",
+    "DELETE FROM tokens WHERE user_id IN "
+    "(SELECT id FROM users WHERE username LIKE 'bench%')",
+    "DELETE FROM users WHERE username LIKE 'bench%'",
+    "DELETE FROM room_equirement_elements WHERE room_id IN "
+    "(SELECT id FROM hotel_rooms WHERE name LIKE 'Bench %' "
+    "AND id NOT IN (SELECT room FROM orders))",
+    "DELETE FROM hotel_rooms WHERE name LIKE 'Bench %' "
+    "AND id NOT IN (SELECT room FROM orders)",
+    "DELETE FROM equirement_elements WHERE name LIKE 'Bench %' "
+    "AND id NOT IN (SELECT element_id FROM room_equirement_elements)",
+)
+
+SEED_USERS = """
+INSERT INTO users (
+    name, surname, patronymic, username, hashed_password, date_of_birth,
+    phone_number, registration_address, gender, role, is_banned, created_at
+)
+SELECT
+    'Иван', 'Петров' || g, 'Сергеевич', 'bench' || lpad(g::text, 7, '0'), $1,
+    date '1960-01-01' + (g % 15000), '+78' || lpad(g::text, 9, '0'),
+    'Москва, ул. Ленина ' || g,
+    CASE WHEN g % 2 = 0 THEN 'MALE'::gender ELSE 'FEMALE'::gender END,
+    CASE WHEN g % 10 = 0 THEN 'CLIENT'::role ELSE 'USER'::role END,
+    false, now() - make_interval(mins => g)
+FROM generate_series(1, $2) AS g
+"""
+
+SEED_ROOMS = """
+INSERT INTO hotel_rooms (name, description, category, floor, status, price)
+SELECT
+    'Bench ' || g, 'Benchmark room ' || g,
+    (enum_range(NULL::roomcategory))[1 + g % 11], 1 + g / 40,
+    'FREE'::roomstatus, 1500 + (g % 11) * 500
+FROM generate_series(1, $1) AS g
+"""
+
+SEED_ORDERS = """
+INSERT INTO orders (client_id, room, arrival_date, eviction_date, is_paid)
+SELECT
+    clients.ids[1 + g % array_length(clients.ids, 1)],
+    rooms.ids[1 + g % array_length(rooms.ids, 1)],
+    stay.arrival, stay.arrival + make_interval(days => 1 + g % 7),
+    g % 3 <> 0
+FROM generate_series(0, $1 - 1) AS g
+CROSS JOIN (
+    SELECT array_agg(id) AS ids FROM users WHERE username LIKE 'bench%'
+) AS clients
+CROSS JOIN (
+    SELECT array_agg(id) AS ids FROM hotel_rooms WHERE name LIKE 'Bench %'
+) AS rooms
+CROSS JOIN LATERAL (
+    SELECT now()::date - 3650
+        + (g / array_length(rooms.ids, 1)) * 8 AS arrival
+) AS stay
+"""
+
+SEED_EQUIPMENT = """
+INSERT INTO equirement_elements (name)
+SELECT 'Bench equipment ' || g FROM generate_series(1, $1) AS g
+ON CONFLICT (name) DO NOTHING
+"""
+
+SEED_ROOM_EQUIPMENT = """
+INSERT INTO room_equirement_elements (room_id, element_id)
+SELECT room.id, element.id
+FROM hotel_rooms AS room
+CROSS JOIN equirement_elements AS element
+WHERE room.name LIKE 'Bench %' AND element.name LIKE 'Bench %'
+  AND (room.id + element.id) % 3 <> 0
+  AND NOT EXISTS (
+      SELECT 1 FROM room_equirement_elements AS link
+      WHERE link.room_id = room.id AND link.element_id = element.id
+  )
+"""
+
+SEED_ADMIN = """
+INSERT INTO users (
+    name, surname, patronymic, username, hashed_password, date_of_birth,
+    phone_number, registration_address, gender, role, is_banned, created_at
+)
+VALUES (
+    'Админ', 'Бенчмарков', 'Петрович', $1, $2, date '1990-01-01',
+    '+77000000000', 'Москва, ул. Ленина 1', 'MALE', 'ADMIN', false, now()
+)
+"""
+
+
+async def seed(
+    env: Dict[str, str], users: int, rooms: int, orders: int
+) -> Dict[str, List[int]]:
+    connection = await asyncpg.connect(
+        host=env["HOST"],
+        port=int(env["PORT"]),
+        user=env["USER"],
+        password=env.get("PASSWORD") or None,
+        database=env["DBNAME"],
+    )
+    try:
+        hashed_password = bcrypt.hashpw(
+            BENCH_PASSWORD.encode("utf-8"), bcrypt.gensalt()
+        ).decode("utf-8")
+
+        async with connection.transaction():
+            for statement in CLEANUP:
+                await connection.execute(statement)
+            await connection.execute(SEED_ADMIN, BENCH_ADMIN, hashed_password)
+            await connection.execute(SEED_USERS, hashed_password, users)
+            await connection.execute(SEED_ROOMS, rooms)
+            await connection.execute(SEED_EQUIPMENT, 8)
+            await connection.execute(SEED_ROOM_EQUIPMENT)
+            await connection.execute(SEED_ORDERS, orders)
+
+        await connection.execute("ANALYZE")
+
+        user_ids = await connection.fetch(
+            "SELECT id FROM users WHERE username LIKE 'bench0%' AND role = 'USER' "
+            "ORDER BY id LIMIT 1000"
+        )
+        room_ids = await connection.fetch(
+            "SELECT id FROM hotel_rooms WHERE name LIKE 'Bench %' ORDER BY id"
+        )
+        equipment_ids = await connection.fetch(
+            "SELECT id FROM equirement_elements WHERE name LIKE 'Bench %' ORDER BY id"
+        )
+        return {
+            "users": [row["id"] for row in user_ids],
+            "rooms": [row["id"] for row in room_ids],
+            "equipment": [row["id"] for row in equipment_ids],
+        }
+    finally:
+        await connection.close()
@@ -0,0 +1,186 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import secrets
+import statistics
+import subprocess
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from .load import write_env_file
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = {
+    "import app.main": "import app.main",
+    "import app.models": "import app.models",
+    "create_app()": "from app.main import create_app; create_app()",
+}
+LAZY_SCENARIOS = ("import app.main", "import app.models")
+DEFERRED_MODULES = ("bcrypt", "jwt", "pytz", "asyncpg", "quart_jwt_extended")
+
+
+def parse_importtime(output: str) -> Tuple[float, Dict[str, float], List[str]]:
+    total = 0.0
+    packages: Dict[str, float] = defaultdict(float)
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        own, cumulative, name = line[len("import time:") :].split("|", 2)
+        if not own.strip().isdigit():
+            continue
+
+        name = name[1:]
+        module = name.strip()
+        modules.append(module)
+        packages[module.split(".")[0]] += int(own) / 1000
+        if not name.startswith(" "):
+            total += int(cumulative) / 1000
+    return total, packages, modules
+
+
+def run_scenario(code: str, env: Dict[str, str]) -> Tuple[float, float, str]:
+    started = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    wall = (time.perf_counter() - started) * 1000
+    if process.returncode != 0:
+        raise RuntimeError(f"{code!r} failed:\n{process.stderr[-2000:]}")
+    imports, _, _ = parse_importtime(process.stderr)
+    return wall, imports, process.stderr
+
+
+def measure(code: str, env: Dict[str, str], runs: int, top: int) -> Dict[str, object]:
+    walls, imports = [], []
+    packages: Dict[str, List[float]] = defaultdict(list)
+    modules: List[str] = []
+    for _ in range(runs):
+        wall, total, output = run_scenario(code, env)
+        walls.append(wall)
+        imports.append(total)
+        _, own, modules = parse_importtime(output)
+        for package, seconds in own.items():
+            packages[package].append(seconds)
+
+    slowest = sorted(
+        ((statistics.median(times), package) for package, times in packages.items()),
+        reverse=True,
+    )[:top]
+    return {
+        "wall_ms": round(statistics.median(walls), 1),
+        "import_ms": round(statistics.median(imports), 1),
+        "modules": len(modules),
+        "eager": sorted(
+            {module.split(".")[0] for module in modules} & set(DEFERRED_MODULES)
+        ),
+        "top": {package: round(ms, 1) for ms, package in slowest},
+    }
+
+
+def compare(
+    results: Dict[str, Dict[str, object]], baseline_path: str, tolerance: float
+) -> List[str]:
+    with open(baseline_path, encoding="utf-8") as file:
+        baseline = json.load(file)["scenarios"]
+
+    regressions = []
+    for scenario, current in results.items():
+        previous = baseline.get(scenario)
+        if not previous:
+            continue
+        if current["import_ms"] > previous["import_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{scenario}: imports {previous['import_ms']}ms -> "
+                f"{current['import_ms']}ms"
+            )
+    return regressions
+
+
+def print_report(results: Dict[str, Dict[str, object]]) -> None:
+    print(f"{'scenario':<20}{'wall ms':>10}{'import ms':>12}{'modules':>10}")
+    for scenario, stats in results.items():
+        print(
+            f"{scenario:<20}{stats['wall_ms']:>10}{stats['import_ms']:>12}"
+            f"{stats['modules']:>10}"
+        )
+    for scenario, stats in results.items():
+        top = ", ".join(f"{package} {ms}" for package, ms in stats["top"].items())
+        print(f"\n{scenario}: {top}")
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Время импорта и создания приложения (python -X importtime)"
+    )
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--top", type=int, default=10, help="Сколько самых тяжёлых пакетов показать"
+    )
+    parser.add_argument(
+        "--env-file", help="Файл .env приложения (по умолчанию временный)"
+    )
+    parser.add_argument("--output", help="Сохранить результаты в JSON")
+    parser.add_argument("--compare", help="Сравнить с сохранённым JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_arguments()
+
+    env_file = args.env_file or write_env_file(
+        {
+            "HOST": "127.0.0.1",
+            "PORT": "5432",
+            "USER": "postgres",
+            "PASSWORD": "postgres",
+            "DBNAME": "hotel",
+            "SECRET_KEY": secrets.token_hex(32),
+            "TOKEN_LIFETIME": "3600",
+        }
+    )
+    env = {**os.environ, "ENV_FILE": env_file}
+    try:
+        results = {
+            scenario: measure(code, env, args.runs, args.top)
+            for scenario, code in SCENARIOS.items()
+        }
+    finally:
+        if not args.env_file:
+            os.unlink(env_file)
+
+    print_report(results)
+
+    regressions = [
+        f"{scenario}: imports {', '.join(results[scenario]['eager'])} eagerly"
+        for scenario in LAZY_SCENARIOS
+        if results[scenario]["eager"]
+    ]
+
+    report = {
+        "meta": {"python": platform.python_version(), "runs": args.runs},
+        "scenarios": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+    if args.compare:
+        regressions.extend(compare(results, args.compare, args.tolerance))
+
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
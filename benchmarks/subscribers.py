@@ -0,0 +1,215 @@
+import os
+import re
+import sys
+import time
+import asyncio
+import argparse
+import secrets
+from typing import Dict, List
+
+from .client import HTTPClient
+from .load import Server, percentile, read_env_file, write_env_file
+from .postgres import DisposablePostgres
+from .seed import BENCH_ADMIN, BENCH_PASSWORD, seed
+
+STATUS_EVENT = re.compile(
+    rb'event: status\ndata: \{"id":(\d+),"status":"(\w+)","at":([\d.]+)\}'
+)
+
+
+def process_tree(pid: int) -> List[int]:
+    pids = [pid]
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as file:
+            children = [int(child) for child in file.read().split()]
+    except OSError:
+        return pids
+    for child in children:
+        pids.extend(process_tree(child))
+    return pids
+
+
+def rss_kib(pid: int) -> int:
+    total = 0
+    for process in process_tree(pid):
+        try:
+            with open(f"/proc/{process}/status") as file:
+                for line in file:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1])
+        except OSError:
+            continue
+    return total
+
+
+class Subscriber:
+    def __init__(self, port: int, cookies: Dict[str, str]):
+        self.port = port
+        self.cookies = cookies
+        self.latencies: List[float] = []
+        self.received = 0
+
+        self._reader = None
+        self._writer = None
+        self._task = None
+
+    async def connect(self) -> None:
+        self._reader, self._writer = await asyncio.open_connection(
+            "127.0.0.1", self.port
+        )
+        cookie = "; ".join(f"{key}={value}" for key, value in self.cookies.items())
+        self._writer.write(
+            (
+                "GET /rooms/status/stream HTTP/1.1\r\n"
+                f"Host: 127.0.0.1:{self.port}\r\n"
+                f"Cookie: {cookie}\r\n"
+                "Accept: text/event-stream\r\n\r\n"
+            ).encode("latin-1")
+        )
+        await self._writer.drain()
+
+        buffer = b""
+        while b"event: snapshot" not in buffer:
+            data = await self._reader.read(65536)
+            if not data:
+                raise ConnectionError("stream closed before the snapshot")
+            buffer += data
+        self._task = asyncio.create_task(self._listen())
+
+    async def _listen(self) -> None:
+        buffer = b""
+        while True:
+            data = await self._reader.read(65536)
+            if not data:
+                return
+            received_at = time.time()
+            buffer += data
+            for match in STATUS_EVENT.finditer(buffer):
+                self.received += 1
+                self.latencies.append(received_at - float(match.group(3)))
+            buffer = buffer[buffer.rfind(b"\n\n") + 2 :]
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+        if self._writer is not None:
+            self._writer.close()
+
+
+async def measure(args: argparse.Namespace, port: int, server_pid: int) -> int:
+    admin = HTTPClient("127.0.0.1", port)
+    await admin.post("/login", {"username": BENCH_ADMIN, "password": BENCH_PASSWORD})
+    _, _, body = await admin.get("/rooms/board")
+    room_id = int(re.search(rb'id="room-status-(\d+)"', body).group(1))
+
+    await asyncio.sleep(1)
+    rss_before = rss_kib(server_pid)
+
+    subscribers = [Subscriber(port, admin.cookies) for _ in range(args.subscribers)]
+    semaphore = asyncio.Semaphore(args.connect_concurrency)
+
+    async def connect(subscriber: Subscriber) -> None:
+        async with semaphore:
+            await subscriber.connect()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(connect(subscriber) for subscriber in subscribers))
+    connect_seconds = time.perf_counter() - started
+
+    await asyncio.sleep(1)
+    rss_after = rss_kib(server_pid)
+
+    await admin.close()
+    statuses = ("busy", "cleaning", "free")
+    for index in range(args.changes):
+        await admin.post(
+            "/rooms/status",
+            {"room_id": str(room_id), "status": statuses[index % len(statuses)]},
+        )
+        await asyncio.sleep(args.interval)
+    await asyncio.sleep(1)
+
+    latencies = [value for subscriber in subscribers for value in subscriber.latencies]
+    expected = args.subscribers * args.changes
+    for subscriber in subscribers:
+        await subscriber.close()
+    await admin.close()
+
+    per_connection = (rss_after - rss_before) / args.subscribers
+    print(f"subscribers           {args.subscribers}")
+    print(f"connect time          {connect_seconds:.2f} s")
+    print(f"server rss before     {rss_before / 1024:.1f} MiB")
+    print(f"server rss after      {rss_after / 1024:.1f} MiB")
+    print(f"memory per connection {per_connection:.1f} KiB")
+    print(f"events delivered      {len(latencies)} / {expected}")
+    print(f"fan-out p50           {percentile(latencies, 50) * 1000:.2f} ms")
+    print(f"fan-out p95           {percentile(latencies, 95) * 1000:.2f} ms")
+    print(f"fan-out p99           {percentile(latencies, 99) * 1000:.2f} ms")
+    print(f"fan-out max           {max(latencies, default=0) * 1000:.2f} ms")
+
+    if len(latencies) < expected:
+        return 1
+    if args.max_kib and per_connection > args.max_kib:
+        return 1
+    return 0
+
+
+async def benchmark(args: argparse.Namespace, env: Dict[str, str]) -> int:
+    env = {
+        "SECRET_KEY": secrets.token_hex(32),
+        "TOKEN_LIFETIME": "3600",
+        "BOARD_HEARTBEAT": "60",
+        **env,
+    }
+    env_file = write_env_file(env)
+    server = Server(env_file, 1)
+    try:
+        server.migrate()
+        await seed(env, args.users, args.rooms, args.orders)
+        await server.start()
+        return await measure(args, server.port, server.process.pid)
+    finally:
+        server.stop()
+        os.unlink(env_file)
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Нагрузка на табло статусов номеров: много SSE-подписчиков, "
+        "память на соединение и задержка рассылки"
+    )
+    parser.add_argument("--subscribers", type=int, default=500)
+    parser.add_argument("--changes", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=0.2)
+    parser.add_argument("--connect-concurrency", type=int, default=50)
+    parser.add_argument(
+        "--max-kib",
+        type=float,
+        default=0,
+        help="Код возврата 1, если память на соединение превышает порог",
+    )
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--rooms", type=int, default=400)
+    parser.add_argument("--orders", type=int, default=1000)
+    parser.add_argument("--pg-bin", help="Каталог с бинарниками PostgreSQL")
+    parser.add_argument(
+        "--env-file",
+        help="Использовать существующую БД из .env вместо временной "
+        "(в неё будут добавлены тестовые данные)",
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_arguments()
+
+    if args.env_file:
+        env = read_env_file(args.env_file)
+        return asyncio.run(benchmark(args, env))
+
+    with DisposablePostgres(args.pg_bin) as postgres:
+        return asyncio.run(benchmark(args, postgres.env))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
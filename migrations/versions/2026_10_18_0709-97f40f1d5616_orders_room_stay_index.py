@@ -0,0 +1,33 @@
+"""Orders room stay index
+
+Revision ID: 97f40f1d5616
+Revises: 65272bbe6f42
+Create Date: 2026-10-18 07:09:48.913786
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "97f40f1d5616"
+down_revision: Union[str, None] = "65272bbe6f42"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_orders_room_eviction_date",
+        "orders",
+        ["room", "eviction_date"],
+        unique=False,
+        postgresql_include=["arrival_date"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_orders_room_eviction_date", table_name="orders")
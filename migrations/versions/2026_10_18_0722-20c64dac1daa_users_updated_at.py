@@ -0,0 +1,35 @@
+"""Users updated_at
+
+Revision ID: 20c64dac1daa
+Revises: 97f40f1d5616
+Create Date: 2026-10-18 07:22:12.125821
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20c64dac1daa"
+down_revision: Union[str, None] = "97f40f1d5616"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "users",
+        sa.Column(
+            "updated_at",
+            sa.DateTime(),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("users", "updated_at")